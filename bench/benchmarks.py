@@ -0,0 +1,280 @@
+"""Benchmarks for the pages' post-query data preparation.
+
+Every page render runs pandas work on the fetched data before drawing
+anything: resampling chart series, flattening nested API payloads, cohort
+pivots and binned distributions. This suite times those steps (the
+functions in ``utils.prep`` and ``utils.retention`` that the pages call) on
+generated fixtures at several sizes. For each step and size it records the
+median and best wall time over ``--repeat`` runs and the peak memory
+allocated during one extra run under ``tracemalloc``::
+
+    python -m bench.benchmarks --sizes small medium --save v1.4
+    python -m bench.benchmarks --compare v1.4
+
+``--save`` writes the results to ``bench/baselines/<name>.json``.
+``--compare`` reruns the suite and prints the change from a saved baseline
+(a name or a path). It exits with status 1 when a step got slower or larger
+than the tolerances allow, so it can gate a release. Timings only compare
+meaningfully when both runs were on the same machine.
+
+API payloads come from ``bench.standin``'s generators, so they have the
+shape of the real responses. ``--scale`` there corresponds to a size's
+factor here.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bench import standin
+from utils import prep
+from utils.retention import cohort_retention, period_index, retention_pivot
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+SIZES = {"small": 1, "medium": 5, "large": 25}    # fixture scale factors
+REPEAT = 5
+HISTORY_DAYS = 3 * 365           # length of the chart fixtures
+TOKENS = 100                     # token histories on the Asset page at scale 1
+USERS = 20_000                   # users in the retention fixture at scale 1
+TIME_TOLERANCE = 0.25            # slowdown flagged by --compare
+MEMORY_TOLERANCE = 0.10          # peak memory growth flagged by --compare
+MIN_SECONDS = 0.002              # smaller time differences are noise
+START = pd.Timestamp("2022-01-01", tz="UTC")
+TXN_BINS = [0, 1, 10, 50, 100, 1000, 10000, float("inf")]    # the Contract page's bins
+VOLUME_BINS = [0, 1, 10, 100, 1000, 10000, 100000, 1000000, float("inf")]
+
+
+# --- Fixtures ----------------------------------------------------------------------------------------------------------
+# Each builder returns ``(value, rows)``: the step's input and its size in records
+def interchain_chart(scale, seed):
+    # interchainChart points; larger scales add intraday points over the same span
+    rng = np.random.default_rng(seed)
+    n = HISTORY_DAYS * scale
+    df = pd.DataFrame({
+        "timestamp": START.tz_localize(None) + pd.to_timedelta(np.arange(n) * (86_400 / scale), unit="s"),
+        "gmp_num_txs": rng.integers(0, 2_000, n),
+        "gmp_volume": rng.uniform(0, 5e6, n).round(2),
+        "transfers_num_txs": rng.integers(0, 2_000, n),
+        "transfers_volume": rng.uniform(0, 5e6, n).round(2),
+    })
+    return df, n
+
+
+def token_histories(scale, seed):
+    # One sanitized chart frame per token, as the Asset page collects them
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(START, periods=HISTORY_DAYS, freq="D")
+    frames = []
+    for i in range(TOKENS * scale):
+        frames.append(pd.DataFrame({
+            "timestamp": timestamps,
+            "num_txs": rng.integers(0, 500, HISTORY_DAYS),
+            "volume": rng.lognormal(8, 2, HISTORY_DAYS).round(2),
+            "token": "XRP" if i == 0 else f"TOKEN{i}",
+            "type": "ITS" if i % 4 else "Gateway",
+        }))
+    return frames, TOKENS * scale * HISTORY_DAYS
+
+
+def asset_frame(scale, seed):
+    full_df, _ = prep.token_dataset(token_histories(scale, seed)[0], "W")
+    return full_df, len(full_df)
+
+
+def chain_stats(scale, seed):
+    # The ITS page reads GMPStatsByChains for two contracts
+    rng = random.Random(seed)
+    payloads = [standin.synth_stats_by_chains(scale, rng) for _ in range(2)]
+    rows = sum(len(s["destination_chains"]) for payload in payloads for s in payload["source_chains"])
+    return payloads, rows
+
+
+def tvl(scale, seed):
+    assets = standin.synth_tvl(scale, random.Random(seed))["data"]
+    return assets, sum(len(asset["tvl"]) for asset in assets)
+
+
+def contracts(scale, seed):
+    data = standin.synth_stats_by_contracts(scale, random.Random(seed))
+    return data, sum(len(chain["contracts"]) for chain in data["chains"])
+
+
+def contract_frame(scale, seed):
+    df = prep.flatten_contracts(contracts(scale, seed)[0])
+    return df, len(df)
+
+
+def activity_pairs(scale, seed):
+    # Distinct (user_id, month) pairs: users join over time and stay a geometric number of months
+    rng = np.random.default_rng(seed)
+    users = USERS * scale
+    first = period_index(pd.Timestamp.today().normalize() - pd.DateOffset(months=36), "month")[0]
+    joined = first + rng.integers(0, 36, users)
+    stays = rng.geometric(0.3, users)
+    user_ids = np.repeat(np.arange(users, dtype=np.int32), stays)
+    offsets = np.arange(len(user_ids)) - np.repeat(np.cumsum(stays) - stays, stays)
+    pairs = pd.DataFrame({"user_id": user_ids, "period": (np.repeat(joined, stays) + offsets).astype(np.int16)})
+    return pairs, len(pairs)
+
+
+def retention_rows(scale, seed):
+    df = cohort_retention(activity_pairs(scale, seed)[0], "month")
+    return df, len(df)
+
+
+FIXTURES = {
+    "interchain_chart": interchain_chart,
+    "token_histories": token_histories,
+    "asset_frame": asset_frame,
+    "chain_stats": chain_stats,
+    "tvl": tvl,
+    "contracts": contracts,
+    "contract_frame": contract_frame,
+    "activity_pairs": activity_pairs,
+    "retention_rows": retention_rows,
+}
+
+
+# --- Steps -------------------------------------------------------------------------------------------------------------
+# name: (fixture, step); the name's prefix is the page
+STEPS = {
+    "gmp.interchain_totals.day": ("interchain_chart", lambda df: prep.interchain_totals(df, "day")),
+    "gmp.interchain_totals.week": ("interchain_chart", lambda df: prep.interchain_totals(df, "week")),
+    "gmp.interchain_totals.month": ("interchain_chart", lambda df: prep.interchain_totals(df, "month")),
+    "asset.token_dataset.day": ("token_histories", lambda frames: prep.token_dataset(frames, "D")),
+    "asset.token_dataset.week": ("token_histories", lambda frames: prep.token_dataset(frames, "W")),
+    "asset.type_series.week": ("asset_frame", lambda full_df: prep.type_series(full_df, "W")),
+    "its.flatten_chain_stats": ("chain_stats", prep.flatten_chain_stats),
+    "tvl.flatten_tvl": ("tvl", prep.flatten_tvl),
+    "contract.flatten_contracts": ("contracts", prep.flatten_contracts),
+    "contract.distributions": ("contract_frame", lambda df: (
+        prep.distribution(df["Number of Transactions"], TXN_BINS, list(range(len(TXN_BINS) - 1))),
+        prep.distribution(df["Volume"], VOLUME_BINS, list(range(len(VOLUME_BINS) - 1))),
+    )),
+    "retention.cohort_retention": ("activity_pairs", lambda pairs: cohort_retention(pairs, "month")),
+    "retention.pivot": ("retention_rows", retention_pivot),
+}
+
+
+# --- Measurement -------------------------------------------------------------------------------------------------------
+def measure(step, value, repeat=REPEAT):
+    """Median and best seconds of ``repeat`` calls, and the peak MiB allocated by one more."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        step(value)
+        timings.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        step(value)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_s": round(statistics.median(timings), 6),
+        "min_s": round(min(timings), 6),
+        "peak_mib": round(peak / 2**20, 3),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=tuple(SIZES), steps=None, repeat=REPEAT, seed=0, log=print):
+    """Benchmark ``steps`` (name prefixes; all by default) at each of ``sizes``; returns the results document."""
+    selected = {name: spec for name, spec in STEPS.items() if not steps or name.startswith(tuple(steps))}
+    results = {name: {} for name in selected}
+    for size in sizes:
+        fixtures = {}
+        for name, (fixture, step) in selected.items():
+            if fixture not in fixtures:
+                fixtures[fixture] = FIXTURES[fixture](SIZES[size], seed)
+            value, rows = fixtures[fixture]
+            results[name][size] = {"rows": rows, **measure(step, value, repeat)}
+            log(f"{name:<32} {size:<7} {rows:>10,} rows  {results[name][size]['median_s']:>9.4f} s  {results[name][size]['peak_mib']:>9.1f} MiB")
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": f"{platform.system()} {platform.machine()}",
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# --- Baselines ---------------------------------------------------------------------------------------------------------
+def baseline_path(name):
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINES_DIR / f"{name}.json"
+
+
+def save(document, name):
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+
+def compare(baseline, current, log=print):
+    """Print each step's change from ``baseline``; returns the regressions as ``(step, size, metric, ratio)``."""
+    regressions = []
+    for name, by_size in current["results"].items():
+        for size, now in by_size.items():
+            before = baseline["results"].get(name, {}).get(size)
+            if before is None:
+                log(f"{name:<32} {size:<7} new")
+                continue
+            time_ratio = now["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+            memory_ratio = now["peak_mib"] / before["peak_mib"] if before["peak_mib"] else 1.0
+            flags = []
+            if time_ratio > 1 + TIME_TOLERANCE and now["median_s"] - before["median_s"] > MIN_SECONDS:
+                flags.append("SLOWER")
+                regressions.append((name, size, "median_s", time_ratio))
+            if memory_ratio > 1 + MEMORY_TOLERANCE:
+                flags.append("LARGER")
+                regressions.append((name, size, "peak_mib", memory_ratio))
+            log(f"{name:<32} {size:<7} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {' '.join(flags)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    p.add_argument("--steps", nargs="+", help="only steps whose name starts with one of these (e.g. asset tvl)")
+    p.add_argument("--repeat", type=int, default=REPEAT)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--save", metavar="NAME", help="store the results as bench/baselines/NAME.json")
+    p.add_argument("--compare", metavar="BASELINE", help="baseline name or path to compare against")
+    args = p.parse_args()
+
+    document = run(args.sizes, args.steps, args.repeat, args.seed)
+    if args.save:
+        print(f"Saved {save(document, args.save)}")
+    if args.compare:
+        print(f"\nChange from {args.compare}:")
+        regressions = compare(json.loads(baseline_path(args.compare).read_text()), document)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond tolerance")
+            sys.exit(1)
@@ -0,0 +1,305 @@
+"""Headless multi-session load test of the dashboard pages.
+
+Each page script is driven by Streamlit's ``AppTest`` in-process, as many
+concurrent sessions, with the backends replaced by local stand-ins:
+``bench.standin`` answers the Axelarscan and DefiLlama calls, and the DuckDB
+backend (``AXELAR_SQL_BACKEND=duckdb``) serves the warehouse queries from a
+``bench.synthetic`` database. Caches are process-wide, as in a deployment,
+so sessions warm them for each other::
+
+    python -m bench.loadtest --sessions 8 --reruns 5 --pages 1 2 9
+    python -m bench.loadtest --warehouse data/warehouse.duckdb --latency 0.2 --json loadtest.json
+
+Every session loads the page and then reruns it ``--reruns`` times, each
+time after picking a new date window or timeframe the way a viewer would:
+mostly common ranges (last 30 days, last year, ...) and some custom ones.
+Per page, the report gives:
+
+- first-load and rerun latency (p50 / p95),
+- the cache hit rate: the share of backend calls (warehouse queries plus
+  API requests) that the page's runs did not have to make, measured
+  against one cold, uncached run of the page,
+- the resident memory added while the page was under load,
+- failed runs, with the first error.
+
+A run fails when it shows an exception, when ``AppTest`` raises, or when it
+renders no elements at all, which is how a script that does not compile or
+a crashed script runner looks from outside. The exit status is 1 when any
+run failed.
+
+Local stores and caches start empty in a temporary ``AXELAR_DATA_DIR``
+unless ``--data-dir`` is given. Without ``--warehouse``, a warehouse of
+``--rows`` synthetic rows is generated first.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+from bench import standin
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = ROOT / "pages"
+SESSIONS = 8
+RERUNS = 5
+RUN_TIMEOUT = 900                       # seconds AppTest waits for one run
+WAREHOUSE_ROWS = 200_000
+TIMEFRAMES = ["day", "week", "month"]
+COMMON_SPANS = [30, 90, 365, 730]       # days back from today for the usual date windows
+CUSTOM_SHARE = 0.3                      # share of date changes that pick an arbitrary window
+EARLIEST = date(2022, 1, 1)
+
+
+# --- Environment -------------------------------------------------------------------------------------------------------
+def configure(args):
+    """Start the HTTP stand-in and point the app's settings at the local backends.
+
+    Must run before anything under ``utils`` is imported, since the settings
+    are read at import time. Returns the stand-in server.
+    """
+    data_dir = Path(args.data_dir or tempfile.mkdtemp(prefix="axelar-loadtest-")).resolve()
+    os.environ["AXELAR_DATA_DIR"] = str(data_dir)
+    os.environ["AXELAR_SQL_BACKEND"] = "duckdb"
+
+    warehouse = Path(args.warehouse).resolve() if args.warehouse else data_dir / "warehouse.duckdb"
+    os.environ["AXELAR_DUCKDB_PATH"] = str(warehouse)
+    if not warehouse.exists():
+        from bench import synthetic
+
+        print(f"Generating a {args.rows:,}-row synthetic warehouse in {warehouse}")
+        parquet_dir = data_dir / "synthetic"
+        synthetic.generate(parquet_dir, args.rows, seed=args.seed)
+        synthetic.build_warehouse(parquet_dir, warehouse)
+
+    server, url = standin.start(port=0, latency=args.latency, scale=args.scale, seed=args.seed, synthetic=True)
+    os.environ["AXELARSCAN_API_URL"] = url
+    os.environ["LLAMA_API_URL"] = url
+    # Pages open a few files relative to the repository root
+    os.chdir(ROOT)
+    return server
+
+
+def backend_calls(server):
+    """Warehouse queries and API requests made so far."""
+    from utils.duckdb_backend import query_count
+
+    with server.stats_lock:
+        requests = server.requests
+    return query_count(), requests
+
+
+def rss_mib():
+    """Current resident set size of this process."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # No procfs: fall back to the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def page_paths(selected):
+    """Page scripts whose number or name matches one of ``selected`` (all pages when empty)."""
+    pages = sorted(PAGES_DIR.glob("*.py"), key=lambda path: int(path.name.split("_")[0]))
+    if not selected:
+        return pages
+    def matches(path, s):
+        return path.name.split("_")[0] == s if s.isdigit() else s.lower() in path.name.lower()
+
+    return [path for path in pages if any(matches(path, s) for s in selected)]
+
+
+# --- Sessions ----------------------------------------------------------------------------------------------------------
+def date_window(rng):
+    """``(start, end)`` a viewer might pick: usually a common range ending today."""
+    today = date.today()
+    if rng.random() >= CUSTOM_SHARE:
+        return today - timedelta(days=rng.choice(COMMON_SPANS)), today
+    span = (today - EARLIEST).days
+    start = EARLIEST + timedelta(days=rng.randrange(span))
+    return start, min(today, start + timedelta(days=rng.randint(7, 730)))
+
+
+def change_filters(at, rng):
+    """Pick a new date window or timeframe on the page's filters; returns what changed."""
+    timeframes = [box for box in at.selectbox if set(box.options) <= set(TIMEFRAMES)]
+    pickers = [picker for picker in at.date_input if picker.label.startswith(("Start", "End"))]
+    choices = (["timeframe"] if timeframes else []) + (["dates"] if pickers else [])
+    if not choices:
+        return "rerun"
+    change = rng.choice(choices)
+    if change == "timeframe":
+        timeframe = rng.choice(TIMEFRAMES)
+        for box in timeframes:
+            box.set_value(timeframe)
+    else:
+        start, end = date_window(rng)
+        for picker in pickers:
+            picker.set_value(start if picker.label.startswith("Start") else end)
+    return change
+
+
+def compile_error(path):
+    """The error Streamlit hits compiling the page script, or ``None``."""
+    try:
+        compile(path.read_bytes(), str(path), "exec")
+    except (SyntaxError, ValueError) as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def timed_run(at, path):
+    """Run the page; returns the seconds taken and the run's error (``None`` when it succeeded)."""
+    started = time.perf_counter()
+    try:
+        at.run()
+    except Exception as error:
+        return time.perf_counter() - started, f"{type(error).__name__}: {error}"
+    seconds = time.perf_counter() - started
+    if at.exception:
+        return seconds, at.exception[0].value
+    if not at.main.children and not at.sidebar.children:
+        # The script runner logs its own failures instead of rendering them
+        return seconds, compile_error(path) or "the page rendered no elements"
+    return seconds, None
+
+
+def session(path, reruns, seed, think):
+    """One viewer: load the page, then rerun it after each filter change."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(str(path), default_timeout=RUN_TIMEOUT)
+    first, error = timed_run(at, path)
+    errors = [error] if error else []
+    rerun_seconds = []
+    for _ in range(reruns):
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+        change_filters(at, rng)
+        seconds, error = timed_run(at, path)
+        rerun_seconds.append(seconds)
+        if error:
+            errors.append(error)
+    return first, rerun_seconds, errors
+
+
+# --- Load test ---------------------------------------------------------------------------------------------------------
+def percentile(values, q):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def load_page(path, server, sessions, reruns, seed, think):
+    """Run one cold session of ``path``, then ``sessions`` concurrent ones; returns the page's report."""
+    gc.collect()
+    rss_before = rss_mib()
+
+    # The cold run is the yardstick for the hit rate: what one run costs with nothing cached
+    calls_before = backend_calls(server)
+    cold_seconds, _, cold_errors = session(path, 0, seed, 0)
+    cold_calls = sum(backend_calls(server)) - sum(calls_before)
+
+    calls_before = backend_calls(server)
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+        results = list(pool.map(lambda i: session(path, reruns, seed * 1000 + i + 1, think), range(sessions)))
+    warehouse_queries, api_requests = (after - before for after, before in zip(backend_calls(server), calls_before))
+
+    gc.collect()
+    first = [result[0] for result in results]
+    rerun = [seconds for result in results for seconds in result[1]]
+    errors = cold_errors + [error for result in results for error in result[2]]
+    runs = len(first) + len(rerun)
+    avoided = 1 - (warehouse_queries + api_requests) / (runs * cold_calls) if cold_calls else None
+    return {
+        "page": path.name,
+        "sessions": sessions,
+        "runs": runs,
+        "cold_s": round(cold_seconds, 3),
+        "first_p50_s": round(percentile(first, 50), 3),
+        "first_p95_s": round(percentile(first, 95), 3),
+        "rerun_p50_s": round(percentile(rerun, 50), 3) if rerun else None,
+        "rerun_p95_s": round(percentile(rerun, 95), 3) if rerun else None,
+        "cold_backend_calls": cold_calls,
+        "warehouse_queries": warehouse_queries,
+        "api_requests": api_requests,
+        "cache_hit_rate": round(min(max(avoided, 0.0), 1.0), 3) if avoided is not None else None,
+        "rss_growth_mib": round(rss_mib() - rss_before, 1),
+        "errors": len(errors),
+        "first_error": errors[0][:300] if errors else None,
+    }
+
+
+def print_report(reports):
+    header = f"{'page':<36} {'runs':>5} {'first p50':>10} {'rerun p50':>10} {'rerun p95':>10} {'hit rate':>9} {'RSS +MiB':>9} {'failed':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    for report in reports:
+        print(
+            f"{report['page']:<36} {report['runs']:>5} {fmt(report['first_p50_s'], '>9.2f')}s "
+            f"{fmt(report['rerun_p50_s'], '>9.2f')}s {fmt(report['rerun_p95_s'], '>9.2f')}s "
+            f"{fmt(report['cache_hit_rate'], '>9.0%')} {report['rss_growth_mib']:>9.1f} {report['errors']:>7}"
+        )
+    for report in reports:
+        if report["first_error"]:
+            print(f"\n{report['page']}: {report['errors']} failed run(s), first: {report['first_error']}")
+
+
+def parser():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--pages", nargs="+", help="page numbers or name fragments (default: all pages)")
+    p.add_argument("--sessions", type=int, default=SESSIONS, help="concurrent sessions per page")
+    p.add_argument("--reruns", type=int, default=RERUNS, help="filter changes per session")
+    p.add_argument("--think", type=float, default=0.0, help="mean seconds a session waits between reruns")
+    p.add_argument("--warehouse", help="existing DuckDB warehouse (default: generate one)")
+    p.add_argument("--rows", type=int, default=WAREHOUSE_ROWS, help="rows of the generated warehouse")
+    p.add_argument("--data-dir", help="AXELAR_DATA_DIR for local stores (default: a new temporary directory)")
+    p.add_argument("--latency", type=float, default=0.0, help="seconds the API stand-in adds to each response")
+    p.add_argument("--scale", type=int, default=1, help="API stand-in payload scale")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    p.add_argument("--verbose", action="store_true", help="show Streamlit's log (tracebacks, deprecation warnings)")
+    return p
+
+
+if __name__ == "__main__":
+    args = parser().parse_args()
+    json_path = Path(args.json).resolve() if args.json else None
+    if not args.verbose:
+        # Failed runs are counted in the report; their tracebacks would drown it. Setting
+        # the option keeps the level when Streamlit re-reads its config
+        from streamlit import config, logger
+
+        config.set_option("logger.level", "critical")
+        logger.set_log_level("critical")
+    server = configure(args)
+    reports = []
+    for path in page_paths(args.pages):
+        print(f"Loading {path.name} with {args.sessions} sessions", flush=True)
+        reports.append(load_page(path, server, args.sessions, args.reruns, args.seed, args.think))
+    server.shutdown()
+    print_report(reports)
+    if json_path:
+        json_path.write_text(json.dumps({"options": vars(args), "pages": reports}, indent=2, default=str) + "\n")
+    failed = sum(report["errors"] for report in reports)
+    if failed:
+        print(f"\n{failed} failed run(s)")
+        sys.exit(1)
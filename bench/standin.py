@@ -0,0 +1,379 @@
+"""Offline stand-in for the Axelarscan and DefiLlama APIs.
+
+Serves every endpoint the pages call from one local HTTP server, so the
+dashboard's fetch and parse paths can be exercised and benchmarked without
+network access. Point the app at it with the base URL overrides read by
+``utils.http_client``::
+
+    python -m bench.standin --port 8765 --latency 0.15 --error-rate 0.02 --scale 10
+    AXELARSCAN_API_URL=http://127.0.0.1:8765 LLAMA_API_URL=http://127.0.0.1:8765 streamlit run 🏠Home.py
+
+Responses come from recorded fixtures in ``bench/fixtures`` when present;
+capture them once with ``python -m bench.standin record`` on a machine that
+can reach the real APIs. Recorded asset lists are replicated ``--scale``
+times and recorded charts are cut to the requested ``fromTime`` /
+``toTime``. Endpoints without a fixture, or every endpoint with
+``--synthetic``, get generated payloads of the same shape: ``--scale``
+multiplies the number of chains, assets and contracts, and ``--years`` is
+the length of the chart histories. Generated payloads are seeded from the
+request, so the same request always gets the same response.
+
+``--latency`` delays each response (uniformly within +/- ``--jitter`` of
+it) and ``--error-rate`` answers that share of requests with
+``--error-status``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+AXELARSCAN_LIVE = "https://api.axelarscan.io"
+LLAMA_LIVE = "https://api.llama.fi"
+RECORD_PATHS = [
+    (AXELARSCAN_LIVE, "/api/getChains"),
+    (AXELARSCAN_LIVE, "/api/getAssets"),
+    (AXELARSCAN_LIVE, "/api/getITSAssets"),
+    (AXELARSCAN_LIVE, "/api/getTVL"),
+    (AXELARSCAN_LIVE, "/api/getTokensPrice?symbol=AXL"),
+    (AXELARSCAN_LIVE, "/api/getTotalSupply"),
+    (AXELARSCAN_LIVE, "/api/interchainChart"),
+    (AXELARSCAN_LIVE, "/gmp/GMPChart"),
+    (AXELARSCAN_LIVE, "/gmp/GMPStatsByChains"),
+    (AXELARSCAN_LIVE, "/gmp/GMPStatsByContracts"),
+    (AXELARSCAN_LIVE, "/gmp/GMPTopITSAssets"),
+    (LLAMA_LIVE, "/v2/chains"),
+]
+# Sizes at --scale 1, close to the live APIs
+CHAINS = 70
+GATEWAY_ASSETS = 80
+ITS_ASSETS = 400
+CONTRACTS_PER_CHAIN = 8
+LLAMA_CHAINS = 400
+DAY_MS = 86_400_000
+
+
+# --- Fixtures ----------------------------------------------------------------------------------------------------------
+def fixture_path(path):
+    return FIXTURES_DIR / f"{path.strip('/').replace('/', '_')}.json"
+
+
+def record(paths=RECORD_PATHS):
+    """Save the live response of each ``(base, path)`` as a fixture."""
+    import httpx
+
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(timeout=120, follow_redirects=True) as client:
+        for base, path in paths:
+            response = client.get(f"{base}{path}")
+            response.raise_for_status()
+            fixture_path(urlparse(path).path).write_text(response.text)
+            print(f"Recorded {path} ({len(response.content):,} bytes)")
+
+
+def load_fixture(path):
+    try:
+        return json.loads(fixture_path(path).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def replicate(items, scale):
+    """``scale`` copies of a recorded list, later copies with suffixed ids, symbols and addresses."""
+    out = list(items)
+    for copy_no in range(1, scale):
+        for item in items:
+            item = dict(item)
+            for field in ["id", "symbol", "denom", "chain_id", "chain_name", "name"]:
+                if isinstance(item.get(field), str):
+                    item[field] = f"{item[field]}-{copy_no}"
+            if isinstance(item.get("addresses"), list):
+                item["addresses"] = [f"{address}{copy_no:02x}" for address in item["addresses"]]
+            out.append(item)
+    return out
+
+
+def window(points, query):
+    """Chart points between the request's ``fromTime`` and ``toTime`` (epoch seconds)."""
+    start = int(query.get("fromTime", 0)) * 1000
+    end = int(query.get("toTime", 2 ** 40)) * 1000
+    return [point for point in points if start <= int(point.get("timestamp", 0)) <= end]
+
+
+# --- Synthetic payloads ------------------------------------------------------------------------------------------------
+def _address(rng):
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+
+
+def chain_ids(scale):
+    return [f"chain-{i}" for i in range(CHAINS * scale)]
+
+
+def synth_chains(scale, rng):
+    return [
+        {
+            "chain_id": chain_id,
+            "chain_name": chain_id.replace("chain-", "Chain "),
+            "chain_type": rng.choice(["evm", "cosmos", "vm"]),
+            "native_token": {"symbol": f"TKN{i}"},
+            "explorer": {"name": f"Explorer {i}"},
+            "endpoints": {"rpc": [f"https://rpc.{chain_id}.example"]},
+            "gateway": {"address": _address(rng)},
+        }
+        for i, chain_id in enumerate(chain_ids(scale))
+    ]
+
+
+def synth_gateway_assets(scale, rng):
+    chains = chain_ids(scale)
+    return [
+        {
+            "id": f"gateway-{i}",
+            "denom": f"u{i}",
+            "native_chain": rng.choice(chains),
+            "name": f"Gateway Token {i}",
+            "symbol": f"GW{i}",
+            "decimals": 6,
+            "image": f"/logos/assets/gw{i}.svg",
+            "coingecko_id": f"gateway-token-{i}",
+            "addresses": {chain: {"address": _address(rng), "symbol": f"axlGW{i}"} for chain in rng.sample(chains, 3)},
+        }
+        for i in range(GATEWAY_ASSETS * scale)
+    ]
+
+
+def synth_its_assets(scale, rng):
+    return [
+        {
+            "id": f"its-{i}",
+            "symbol": f"ITS{i}",
+            "decimals": 18,
+            "image": f"/logos/assets/its{i}.svg",
+            "coingecko_id": f"its-token-{i}",
+            "addresses": [its_address(i)],
+        }
+        for i in range(ITS_ASSETS * scale)
+    ]
+
+
+def its_address(i):
+    # Shared by getITSAssets and GMPTopITSAssets so the ITS tab can resolve symbols
+    return _address(random.Random(i))
+
+
+def daily_points(query, options, fields):
+    """One point per day of the last ``options.years`` inside the request's window.
+
+    A day's values depend only on the series (its non-time parameters and
+    fields), so overlapping windows agree, as with the real API.
+    """
+    series = [sorted((k, v) for k, v in query.items() if k not in ("fromTime", "toTime")), sorted(fields), options.seed]
+    series_seed = zlib.crc32(json.dumps(series).encode())
+    years = options.years
+    now_ms = int(datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp() * 1000)
+    first_ms = now_ms - int(years * 365) * DAY_MS
+    start = max(first_ms, int(query.get("fromTime", 0)) * 1000)
+    end = min(now_ms, int(query.get("toTime", now_ms // 1000)) * 1000)
+    start -= (start - first_ms) % DAY_MS
+    points = []
+    for timestamp in range(start, end + 1, DAY_MS):
+        rng = random.Random(series_seed * 100_003 + timestamp // DAY_MS)
+        point = {"timestamp": timestamp}
+        for field, scale in fields.items():
+            point[field] = round(rng.uniform(0.2, 1.8) * scale, 2) if "volume" in field else rng.randint(0, 2 * scale)
+        points.append(point)
+    return points
+
+
+def synth_tvl(scale, rng):
+    chains = chain_ids(scale)
+    data = []
+    for i in range(GATEWAY_ASSETS * scale + ITS_ASSETS * scale // 4):
+        price = round(rng.uniform(0.01, 100), 4)
+        tvl = {}
+        for chain in rng.sample(chains, 4):
+            total = round(rng.uniform(1e3, 1e7), 2)
+            tvl[chain] = {
+                "total": total,
+                "supply": total,
+                "gateway_address": _address(rng),
+                "contract_data": {"contract_address": _address(rng)},
+            }
+        total = sum(details["total"] for details in tvl.values())
+        data.append({
+            "asset": f"asset-{i}",
+            "price": price,
+            "total": total,
+            "value": round(total * price, 2),
+            "assetType": "its" if i >= GATEWAY_ASSETS * scale else "gateway",
+            "is_abnormal_supply": rng.random() < 0.02,
+            "tvl": tvl,
+        })
+    return {"data": data}
+
+
+def synth_stats_by_chains(scale, rng):
+    chains = chain_ids(scale)
+    return {"source_chains": [
+        {
+            "key": source,
+            "num_txs": rng.randint(0, 50_000),
+            "volume": round(rng.uniform(0, 1e7), 2),
+            "destination_chains": [
+                {"key": destination, "num_txs": rng.randint(0, 10_000), "volume": round(rng.uniform(0, 2e6), 2)}
+                for destination in rng.sample(chains, min(10, len(chains)))
+                if destination != source
+            ],
+        }
+        for source in chains
+    ]}
+
+
+def synth_stats_by_contracts(scale, rng):
+    return {"chains": [
+        {
+            "key": chain,
+            "contracts": [
+                {"key": _address(rng), "num_txs": rng.randint(1, 100_000), "volume": round(rng.uniform(0, 1e7), 2)}
+                for _ in range(CONTRACTS_PER_CHAIN)
+            ],
+        }
+        for chain in chain_ids(scale)
+    ]}
+
+
+def synth_top_its_assets(scale, rng):
+    return {"data": [
+        {"key": its_address(i), "num_txs": rng.randint(1, 100_000), "volume": round(rng.uniform(0, 1e7), 2)}
+        for i in range(ITS_ASSETS * scale)
+        if rng.random() < 0.6
+    ]}
+
+
+def synth_llama_chains(scale, rng):
+    return [
+        {"name": f"Llama Chain {i}", "tvl": round(rng.lognormvariate(15, 3), 2), "tokenSymbol": f"LC{i}"}
+        for i in range(LLAMA_CHAINS * scale)
+    ]
+
+
+SYNTHETIC = {
+    "/api/getChains": lambda q, o, rng: synth_chains(o.scale, rng),
+    "/api/getAssets": lambda q, o, rng: synth_gateway_assets(o.scale, rng),
+    "/api/getITSAssets": lambda q, o, rng: synth_its_assets(o.scale, rng),
+    "/api/getTVL": lambda q, o, rng: synth_tvl(o.scale, rng),
+    "/api/getTokensPrice": lambda q, o, rng: {q.get("symbol", "AXL"): {"price": round(rng.uniform(0.2, 2), 4)}},
+    "/api/getTotalSupply": lambda q, o, rng: round(rng.uniform(1.1e9, 1.3e9), 2),
+    "/api/interchainChart": lambda q, o, rng: {"data": daily_points(q, o, {
+        "gmp_num_txs": 4_000, "gmp_volume": 5e6, "transfers_num_txs": 2_000, "transfers_volume": 8e6,
+    })},
+    "/gmp/GMPChart": lambda q, o, rng: {"data": daily_points(q, o, {"num_txs": 500, "volume": 2e5})},
+    "/token/transfersChart": lambda q, o, rng: {"data": daily_points(q, o, {"num_txs": 300, "volume": 4e5})},
+    "/gmp/GMPStatsByChains": lambda q, o, rng: synth_stats_by_chains(o.scale, rng),
+    "/gmp/GMPStatsByContracts": lambda q, o, rng: synth_stats_by_contracts(o.scale, rng),
+    "/gmp/GMPTopITSAssets": lambda q, o, rng: synth_top_its_assets(o.scale, rng),
+    "/v2/chains": lambda q, o, rng: synth_llama_chains(o.scale, rng),
+}
+
+
+def respond(path, query, options):
+    """The JSON payload for a request, or ``None`` for an unknown path."""
+    recorded = None if options.synthetic else load_fixture(path)
+    if recorded is not None:
+        if isinstance(recorded, list):
+            return replicate(recorded, options.scale)
+        if isinstance(recorded, dict) and isinstance(recorded.get("data"), list) and recorded["data"] and "timestamp" in recorded["data"][0]:
+            return {**recorded, "data": window(recorded["data"], query)}
+        return recorded
+    if path not in SYNTHETIC:
+        return None
+    seed = zlib.crc32(json.dumps([path, sorted(query.items()), options.scale, options.seed]).encode())
+    return SYNTHETIC[path](query, options, random.Random(seed))
+
+
+# --- Server ------------------------------------------------------------------------------------------------------------
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        options = self.server.options
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        with self.server.stats_lock:
+            self.server.requests += 1
+        if options.latency:
+            time.sleep(max(0.0, options.latency * random.uniform(1 - options.jitter, 1 + options.jitter)))
+        if random.random() < options.error_rate:
+            return self._send(options.error_status, {"error": "injected failure"})
+
+        payload = respond(url.path.rstrip("/"), query, options)
+        if payload is None:
+            return self._send(404, {"error": f"no stand-in for {url.path}"})
+        self._send(200, payload)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def parser():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("command", nargs="?", choices=["serve", "record"], default="serve")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    p.add_argument("--jitter", type=float, default=0.5, help="latency varies by +/- this fraction")
+    p.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    p.add_argument("--error-status", type=int, default=503)
+    p.add_argument("--scale", type=int, default=1, help="multiplier for chains, assets and contracts")
+    p.add_argument("--years", type=float, default=4, help="length of generated chart histories")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    return p
+
+
+def start(**overrides):
+    """Run a stand-in server on a daemon thread; returns ``(server, base_url)``.
+
+    Keyword arguments override the command-line defaults (``port=0`` picks a
+    free port). Stop it with ``server.shutdown()``.
+    """
+    options = parser().parse_args([])
+    for name, value in overrides.items():
+        setattr(options, name, value)
+    server = ThreadingHTTPServer((options.host, options.port), StandinHandler)
+    server.daemon_threads = True
+    server.options = options
+    server.requests = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    args = parser().parse_args()
+    if args.command == "record":
+        record()
+    else:
+        server, url = start(**vars(args))
+        print(f"Serving the Axelarscan / DefiLlama stand-in on {url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,346 @@
+"""Synthetic Axelar fact tables at a chosen scale.
+
+Generates the five warehouse tables the pages read (``fact_gmp``,
+``fact_transfers``, ``fact_staking``, ``fact_blocks`` and
+``fact_transactions``) as Parquet, with the columns and JSON ``data`` /
+``call`` variants of ``utils.duckdb_backend.TABLES``. The rows are meant
+to behave like production for capacity planning, not to match it:
+
+- chain popularity, and so routes, is heavy-tailed;
+- USD amounts are log-normal, with a small share of malformed (object)
+  values like the real API's;
+- users repeat: a skewed pool shared between GMP and transfers;
+- about a third of GMP calls go through the ITS contracts, and a small
+  share are ITS token deployments;
+- stakers delegate and later undelegate part of what they delegated, so
+  balances never go negative;
+- activity grows linearly over the period.
+
+``--rows`` is the number of GMP + transfer rows. The other tables are
+sized from it with ``SHARES``. Rows are written in ``CHUNK_ROWS`` parts
+under ``<out>/<schema>.<table>/``, and ``--warehouse`` also loads them
+into a DuckDB file for ``AXELAR_SQL_BACKEND=duckdb``::
+
+    python -m bench.synthetic --rows 10_000_000 --out data/synthetic/10m --warehouse data/warehouse.duckdb
+"""
+import argparse
+import os
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from utils.duckdb_backend import TABLES, create_tables
+from utils.fact_store import ITS_CONTRACTS
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+START = date(2022, 1, 1)
+CHUNK_ROWS = 1_000_000
+SHARES = {                       # rows per GMP + transfer row
+    "axelscan.fact_gmp": 0.4,
+    "axelscan.fact_transfers": 0.6,
+    "gov.fact_staking": 0.05,
+    "core.fact_transactions": 1.0,
+    "core.fact_blocks": 0.1,
+}
+USERS_PER_ROW = 1 / 6            # size of the user pool
+VALIDATORS = 75
+CHAINS = [
+    "ethereum", "arbitrum", "base", "optimism", "polygon", "avalanche", "binance", "osmosis", "axelarnet",
+    "moonbeam", "fantom", "celo", "linea", "scroll", "mantle", "blast", "fraxtal", "kava", "filecoin",
+    "immutable", "sui", "stellar", "xrpl", "xrpl-evm", "neutron", "injective", "sei", "agoric", "juno",
+    "kujira", "secret-snip", "evmos", "crescent", "archway", "umee", "stride", "terra-2", "flow", "centrifuge",
+    "hedera",
+]
+ASSETS = [  # symbol, USD price
+    ("USDC", 1.0), ("axlUSDC", 1.0), ("USDT", 1.0), ("WETH", 3000.0), ("WBTC", 60000.0), ("AXL", 0.6),
+    ("ATOM", 7.0), ("OSMO", 0.5), ("DAI", 1.0), ("FRAX", 1.0), ("ITS", 0.1), ("SQD", 0.05),
+]
+EVENTS = {"ContractCall": 0.6, "ContractCallWithToken": 0.4}
+DEPLOYMENT_SHARE = 0.01
+ITS_SHARE = 0.35
+FAILED_SHARE = 0.05
+MALFORMED_SHARE = 0.005
+
+
+def _chain_weights():
+    weights = 1 / np.arange(1, len(CHAINS) + 1) ** 1.1
+    return weights / weights.sum()
+
+
+def _timestamps(rng, n, start, end):
+    """``n`` timestamps whose density grows linearly from ``start`` to ``end``."""
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    seconds = span * np.sqrt(rng.random(n))
+    return pd.Timestamp(start) + pd.to_timedelta(seconds, unit="s")
+
+
+def _users(rng, n, pool):
+    """Indices into a pool of ``pool`` users, skewed so a few users do much of the activity.
+
+    With ``u ** 3`` the top 1% of users make about a fifth of the rows and
+    the top 10% close to half.
+    """
+    return (pool * rng.random(n) ** 3).astype(np.int64)
+
+
+def _routes(rng, n):
+    weights = _chain_weights()
+    source = rng.choice(len(CHAINS), n, p=weights)
+    destination = rng.choice(len(CHAINS), n, p=weights)
+    clash = source == destination
+    destination[clash] = (destination[clash] + 1 + rng.integers(0, len(CHAINS) - 1, clash.sum())) % len(CHAINS)
+    return np.asarray(CHAINS, dtype=object)[source], np.asarray(CHAINS, dtype=object)[destination]
+
+
+def _usd(rng, n):
+    return np.round(rng.lognormal(mean=4.0, sigma=2.2, size=n), 2)
+
+
+# --- Tables ------------------------------------------------------------------------------------------------------------
+# Each builder returns a flat frame and the DuckDB SELECT that turns it into the table's columns
+
+def gmp_rows(rng, n, offset, start, end, pool):
+    source, destination = _routes(rng, n)
+    asset = rng.integers(0, len(ASSETS), n)
+    value = _usd(rng, n)
+    status = np.where(rng.random(n) < FAILED_SHARE, "error", "executed")
+    frame = pd.DataFrame({
+        "row": np.arange(offset, offset + n),
+        "created_at": _timestamps(rng, n, start, end),
+        "status": status,
+        "simplified_status": np.where(status == "executed", "received", "failed"),
+        "event": rng.choice(list(EVENTS), n, p=list(EVENTS.values())),
+        "source_chain": source,
+        "destination_chain": destination,
+        "user_idx": _users(rng, n, pool),
+        "its": rng.random(n) < ITS_SHARE,
+        "its_contract": rng.integers(0, len(ITS_CONTRACTS), n),
+        "contract_idx": rng.integers(0, 5_000, n),
+        "value": np.where(rng.random(n) < 0.1, np.nan, value),
+        "malformed": rng.random(n) < MALFORMED_SHARE,
+        "symbol": np.asarray([symbol for symbol, _ in ASSETS], dtype=object)[asset],
+        "price": np.asarray([price for _, price in ASSETS])[asset],
+        "gas_used": rng.integers(50_000, 600_000, n),
+        "gas_price_usd": np.round(rng.lognormal(-12.5, 1.0, n), 12),
+        "express_fee_usd": np.where(rng.random(n) < 0.05, np.round(rng.lognormal(0, 1, n), 4), np.nan),
+        "deployment": rng.random(n) < DEPLOYMENT_SHARE,
+        "existing_token": rng.random(n) < 0.3,
+        "token_idx": rng.integers(0, max(n // 50, 1), n) + offset,
+    })
+    its_contracts = "[" + ", ".join(f"'{address}'" for address in ITS_CONTRACTS) + "]"
+    select = f"""
+    SELECT
+      md5('gmp' || row) || '-' || row AS id,
+      created_at, status, simplified_status, event,
+      json_object(
+        'call', json_object(
+          'chain', source_chain,
+          'transaction', json_object('from', '0x' || substr(sha256('user' || user_idx), 1, 40)),
+          'returnValues', json_object('destinationChain', destination_chain)
+        ),
+        'approved', json_object('returnValues', json_object(
+          'contractAddress', CASE WHEN its or deployment THEN {its_contracts}[its_contract + 1]
+                                  ELSE '0x' || substr(sha256('contract' || contract_idx), 1, 40) END
+        )),
+        'value', CASE WHEN malformed THEN json_object('amount', value) ELSE to_json(value) END,
+        'amount', to_json(round(value / price, 6)),
+        'symbol', symbol,
+        'gas', json_object('gas_used_amount', gas_used),
+        'gas_price_rate', json_object('source_token', json_object('token_price', json_object('usd', gas_price_usd))),
+        'fees', json_object('express_fee_usd', express_fee_usd),
+        'interchain_token_deployment_started', CASE WHEN deployment THEN json_object(
+          'event', 'InterchainTokenDeploymentStarted',
+          'tokenId', '0x' || sha256('token-id' || token_idx),
+          'tokenName', 'Token ' || token_idx,
+          'tokenSymbol', 'TKN' || token_idx
+        ) END
+      )::JSON AS data,
+      json_object(
+        'chain', source_chain,
+        'receipt', json_object('logs', json_array(json_object(
+          'address', CASE WHEN existing_token THEN {its_contracts}[its_contract + 1]
+                          ELSE '0x' || substr(sha256('token' || token_idx), 1, 40) END
+        )))
+      )::JSON AS call
+    FROM frame
+    """
+    return frame, select
+
+
+def transfer_rows(rng, n, offset, start, end, pool):
+    source, destination = _routes(rng, n)
+    asset = rng.integers(0, len(ASSETS), n)
+    price = np.asarray([price for _, price in ASSETS])[asset]
+    status = np.where(rng.random(n) < FAILED_SHARE, "error", "executed")
+    frame = pd.DataFrame({
+        "row": np.arange(offset, offset + n),
+        "created_at": _timestamps(rng, n, start, end),
+        "status": status,
+        "simplified_status": np.where(status == "executed", "received", "failed"),
+        "user_idx": _users(rng, n, pool),
+        "source_chain": source,
+        "destination_chain": destination,
+        "amount": np.round(_usd(rng, n) / price, 6),
+        "fee": np.round(rng.lognormal(-1, 1, n), 6),
+        "asset": np.asarray([f"u{symbol.lower()}" for symbol, _ in ASSETS], dtype=object)[asset],
+        "price": price,
+        "malformed": rng.random(n) < MALFORMED_SHARE,
+    })
+    select = """
+    SELECT
+      md5('transfer' || row) || '_' || source_chain AS id,
+      created_at, status, simplified_status,
+      '0x' || substr(sha256('user' || user_idx), 1, 40) AS sender_address,
+      json_object(
+        'send', json_object(
+          'original_source_chain', source_chain,
+          'original_destination_chain', destination_chain,
+          'amount', CASE WHEN malformed THEN json_array(amount) ELSE to_json(amount) END,
+          'fee_value', fee
+        ),
+        'link', json_object('asset', asset, 'price', price)
+      )::JSON AS data
+    FROM frame
+    """
+    return frame, select
+
+
+def staking_rows(rng, n, offset, start, end, pool):
+    delegations = max(int(n * 0.7), 1)
+    undelegations = n - delegations
+    when = _timestamps(rng, delegations, start, end)
+    amount = np.round(rng.lognormal(mean=7, sigma=2, size=delegations), 6) * 1e6
+    delegator = _users(rng, delegations, max(pool // 20, 1))
+    validator = rng.integers(0, VALIDATORS, delegations)
+
+    # Undelegate part of an earlier delegation, some time after it
+    source = rng.choice(delegations, undelegations, replace=False) if undelegations <= delegations else rng.integers(0, delegations, undelegations)
+    remaining = (pd.Timestamp(end) - when[source]).total_seconds().to_numpy()
+    failed = rng.random(n) < 0.02
+    failed[source] = False  # a delegation that is later undelegated went through
+    frame = pd.DataFrame({
+        "row": np.arange(offset, offset + n),
+        "block_timestamp": np.concatenate([when, when[source] + pd.to_timedelta(remaining * rng.random(undelegations), unit="s")]),
+        "action": ["delegate"] * delegations + ["undelegate"] * undelegations,
+        "amount": np.concatenate([amount, np.floor(amount[source] * rng.uniform(0.1, 1.0, undelegations))]),
+        "delegator_idx": np.concatenate([delegator, delegator[source]]),
+        "validator_idx": np.concatenate([validator, validator[source]]),
+        "failed": failed,
+    })
+    select = """
+    SELECT
+      block_timestamp,
+      upper(md5('staking' || row)) AS tx_id,
+      NOT failed AS tx_succeeded,
+      action,
+      'uaxl' AS currency,
+      amount,
+      'axelar1' || substr(sha256('user' || delegator_idx), 1, 38) AS delegator_address,
+      'axelarvaloper1' || substr(sha256('validator' || validator_idx), 1, 38) AS validator_address
+    FROM frame
+    """
+    return frame, select
+
+
+def transaction_rows(rng, n, offset, start, end, pool):
+    frame = pd.DataFrame({
+        "row": np.arange(offset, offset + n),
+        "block_timestamp": _timestamps(rng, n, start, end),
+        "user_idx": _users(rng, n, pool),
+        "failed": rng.random(n) < 0.03,
+    })
+    select = """
+    SELECT
+      block_timestamp,
+      upper(md5('tx' || row)) AS tx_id,
+      'axelar1' || substr(sha256('user' || user_idx), 1, 38) AS tx_from,
+      NOT failed AS tx_succeeded
+    FROM frame
+    """
+    return frame, select
+
+
+def block_rows(rng, n, offset, start, end, pool):
+    # Evenly spaced blocks (real ones come every few seconds) with growing load
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    position = (np.arange(n) + 0.5) / n
+    frame = pd.DataFrame({
+        "block_id": np.arange(offset, offset + n) + 1,
+        "block_timestamp": pd.Timestamp(start) + pd.to_timedelta(position * span, unit="s"),
+        "tx_count": rng.poisson(2 + 20 * position),
+    })
+    return frame, "SELECT block_id, block_timestamp, tx_count FROM frame"
+
+
+BUILDERS = {
+    "axelscan.fact_gmp": gmp_rows,
+    "axelscan.fact_transfers": transfer_rows,
+    "gov.fact_staking": staking_rows,
+    "core.fact_transactions": transaction_rows,
+    "core.fact_blocks": block_rows,
+}
+
+
+# --- Output ------------------------------------------------------------------------------------------------------------
+def generate(out_dir, rows, seed=0, start=START, end=None):
+    """Write every table as Parquet parts under ``out_dir``; returns ``{table: rows}``."""
+    out_dir = Path(out_dir)
+    end = end or datetime.now().replace(microsecond=0)
+    pool = max(int(rows * USERS_PER_ROW), 1)
+    con = duckdb.connect()
+    counts = {}
+    for table, builder in BUILDERS.items():
+        total = int(rows * SHARES[table])
+        table_dir = out_dir / table
+        shutil.rmtree(table_dir, ignore_errors=True)
+        table_dir.mkdir(parents=True)
+        rng = np.random.default_rng([seed, list(BUILDERS).index(table)])
+        # Blocks are spaced by position in the whole table, so they are sized in one pass
+        chunk_rows = total if table == "core.fact_blocks" else CHUNK_ROWS
+        for part, offset in enumerate(range(0, total, chunk_rows)):
+            n = min(chunk_rows, total - offset)
+            frame, select = builder(rng, n, offset, start, end, pool)
+            con.register("frame", frame)
+            con.execute(f"COPY ({select}) TO '{(table_dir / f'part-{part:05d}.parquet').as_posix()}' (FORMAT PARQUET)")
+            con.unregister("frame")
+        counts[table] = total
+    return counts
+
+
+def build_warehouse(parquet_dir, path):
+    """Load the Parquet tables under ``parquet_dir`` into a fresh DuckDB file at ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    tmp_path.unlink(missing_ok=True)
+    with duckdb.connect(str(tmp_path)) as con:
+        for table, columns in TABLES.items():
+            parts = sorted((Path(parquet_dir) / table).glob("*.parquet"))
+            if not parts:
+                continue
+            con.execute(f"CREATE SCHEMA IF NOT EXISTS {table.split('.')[0]}")
+            casts = ", ".join(f"CAST({column} AS {dtype}) AS {column}" for column, dtype in columns.items())
+            con.execute(f"CREATE TABLE {table} AS SELECT {casts} FROM read_parquet('{(Path(parquet_dir) / table).as_posix()}/*.parquet')")
+        create_tables(con)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--rows", type=int, default=1_000_000, help="GMP + transfer rows")
+    p.add_argument("--out", default="data/synthetic", help="directory for the Parquet tables")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--start", type=date.fromisoformat, default=START)
+    p.add_argument("--warehouse", help="also load the tables into this DuckDB file")
+    args = p.parse_args()
+
+    counts = generate(args.out, args.rows, seed=args.seed, start=args.start)
+    for table, n in counts.items():
+        print(f"{table}: {n:,} rows")
+    if args.warehouse:
+        build_warehouse(args.out, args.warehouse)
+        print(f"Loaded into {args.warehouse}")
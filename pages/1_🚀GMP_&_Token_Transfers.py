@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import requests
 import plotly.graph_objects as go
 import plotly.express as px
+from utils.http_client import AXELARSCAN_API, get
+from utils.prep import interchain_totals
 
 # =====================================================
 # PAGE CONFIG
@@ -200,9 +201,9 @@ st.info(
 @st.cache_data
 def load_data():
 
-    url = "https://api.axelarscan.io/api/interchainChart"
+    url = f"{AXELARSCAN_API}/api/interchainChart"
 
-    r = requests.get(url, timeout=30)
+    r = get(url)
 
     r.raise_for_status()
 
@@ -257,96 +258,22 @@ df = df[
 # =====================================================
 # RESAMPLE
 # =====================================================
-if timeframe == "week":
-
-    df["period"] = (
-        df["timestamp"]
-        .dt.to_period("W")
-        .apply(lambda r: r.start_time)
-    )
-
-elif timeframe == "month":
-
-    df["period"] = (
-        df["timestamp"]
-        .dt.to_period("M")
-        .apply(lambda r: r.start_time)
-    )
-
-else:
-
-    df["period"] = df["timestamp"]
-
-grouped = (
-    df.groupby("period")
-    .sum(numeric_only=True)
-    .reset_index()
-)
-
-grouped["total_txs"] = (
-    grouped["gmp_num_txs"] +
-    grouped["transfers_num_txs"]
-)
-
-grouped["total_volume"] = (
-    grouped["gmp_volume"] +
-    grouped["transfers_volume"]
-)
+grouped = interchain_totals(df, timeframe)
 
 # =====================================================
 # DAILY / WEEKLY STATS
 # =====================================================
-daily_df = df.copy()
-
-daily_df["day"] = daily_df["timestamp"].dt.date
+daily_grouped = interchain_totals(df, "day")
 
-daily_grouped = (
-    daily_df.groupby("day")
-    .sum(numeric_only=True)
-    .reset_index()
-)
-
-daily_grouped["daily_volume"] = (
-    daily_grouped["gmp_volume"] +
-    daily_grouped["transfers_volume"]
-)
-
-daily_grouped["daily_txs"] = (
-    daily_grouped["gmp_num_txs"] +
-    daily_grouped["transfers_num_txs"]
-)
-
-avg_daily_volume = daily_grouped["daily_volume"].mean()
-
-avg_daily_txs = daily_grouped["daily_txs"].mean()
+avg_daily_volume = daily_grouped["total_volume"].mean()
 
-weekly_df = df.copy()
+avg_daily_txs = daily_grouped["total_txs"].mean()
 
-weekly_df["week"] = (
-    weekly_df["timestamp"]
-    .dt.to_period("W")
-    .apply(lambda r: r.start_time)
-)
-
-weekly_grouped = (
-    weekly_df.groupby("week")
-    .sum(numeric_only=True)
-    .reset_index()
-)
-
-weekly_grouped["weekly_volume"] = (
-    weekly_grouped["gmp_volume"] +
-    weekly_grouped["transfers_volume"]
-)
-
-weekly_grouped["weekly_txs"] = (
-    weekly_grouped["gmp_num_txs"] +
-    weekly_grouped["transfers_num_txs"]
-)
+weekly_grouped = interchain_totals(df, "week")
 
-avg_weekly_volume = weekly_grouped["weekly_volume"].mean()
+avg_weekly_volume = weekly_grouped["total_volume"].mean()
 
-avg_weekly_txs = weekly_grouped["weekly_txs"].mean()
+avg_weekly_txs = weekly_grouped["total_txs"].mean()
 
 # =====================================================
 # KPI FUNCTION
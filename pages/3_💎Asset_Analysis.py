@@ -1,8 +1,13 @@
-import requests
+import time
 import pandas as pd
 import streamlit as st
 import plotly.express as px
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
+from utils.registry import registry
+from utils.prep import token_dataset, type_series
+from utils.token_series import history, window
+from utils.scheduler import submit_bulk
 
 # =====================================================
 # Page Config
@@ -62,114 +67,14 @@ st.sidebar.markdown(
 # =====================================================
 # Constants
 # =====================================================
-API_BASE = "https://api.axelarscan.io"
+STREAM_INTERVAL = 1.0   # seconds between redraws of the token charts while loading
 
 # =====================================================
 # API Functions
 # =====================================================
-@st.cache_data(ttl=3600)
-def get_its_assets():
-    r = requests.get(f"{API_BASE}/api/getITSAssets", timeout=30)
-    r.raise_for_status()
-    return r.json()
-
-@st.cache_data(ttl=3600)
-def get_gateway_assets():
-    r = requests.get(f"{API_BASE}/api/getAssets", timeout=30)
-    r.raise_for_status()
-    return r.json()
-
 @st.cache_data(ttl=1800)
-def get_chart_data(endpoint, asset, from_time, to_time):
-
-    url = (
-        f"{API_BASE}{endpoint}"
-        f"?asset={asset}"
-        f"&fromTime={from_time}"
-        f"&toTime={to_time}"
-    )
-
-    try:
-        resp = requests.get(url, timeout=60)
-
-        if resp.status_code != 200:
-            return pd.DataFrame()
-
-        data = resp.json()
-
-        if isinstance(data, dict) and "data" in data:
-            return pd.DataFrame(data["data"])
-
-        if isinstance(data, list):
-            return pd.DataFrame(data)
-
-    except Exception:
-        pass
-
-    return pd.DataFrame()
-
-# =====================================================
-# Timestamp Helper
-# =====================================================
-def convert_timestamp_series(s):
-
-    s_num = pd.to_numeric(s, errors="coerce")
-
-    if s_num.dropna().empty:
-        return pd.to_datetime(s, errors="coerce", utc=True)
-
-    maxv = s_num.max()
-
-    if maxv > 1e17:
-        unit = "ns"
-    elif maxv > 1e14:
-        unit = "us"
-    elif maxv > 1e11:
-        unit = "ms"
-    else:
-        unit = "s"
-
-    try:
-        return pd.to_datetime(
-            s_num,
-            unit=unit,
-            errors="coerce",
-            utc=True
-        )
-    except Exception:
-        return pd.to_datetime(
-            s,
-            errors="coerce",
-            utc=True
-        )
-
-# =====================================================
-# Data Cleaning
-# =====================================================
-def sanitize_chart_df(df):
-
-    if df is None or df.empty:
-        return pd.DataFrame()
-
-    for col in ["num_txs", "volume"]:
-
-        if col in df.columns:
-            df[col] = (
-                pd.to_numeric(df[col], errors="coerce")
-                .fillna(0)
-                .astype(float)
-            )
-        else:
-            df[col] = 0.0
-
-    if "timestamp" not in df.columns:
-        return pd.DataFrame()
-
-    df["timestamp"] = convert_timestamp_series(df["timestamp"])
-
-    df = df.dropna(subset=["timestamp"])
-
-    return df[["timestamp", "num_txs", "volume"]]
+def get_token_history(endpoint, asset):
+    return history(endpoint, asset)
 
 # =====================================================
 # UI
@@ -234,8 +139,8 @@ to_time = int(
 # =====================================================
 # Assets
 # =====================================================
-gateway_assets = get_gateway_assets()
-its_assets = get_its_assets()
+gateway_assets = registry().gateway_assets
+its_assets = registry().its_assets
 
 gateway_df = pd.DataFrame(gateway_assets)
 
@@ -289,57 +194,80 @@ st.subheader("📋 Details of Supported Tokens")
 st.dataframe(all_tokens, use_container_width=True)
 
 # =====================================================
-# Fetch Chart Data
+# Chart Helpers
 # =====================================================
-results = []
+def token_chart(grouped, y):
+    return px.bar(
+        grouped,
+        x="timestamp",
+        y=y,
+        color="token",
+        barmode="stack",
+    )
 
-total = len(gateway_df) + len(its_df)
-count = 0
+# =====================================================
+# Fetch Chart Data
+# =====================================================
+# Every token's full history is loaded on the bulk worker pool (bounded, and apart
+# from the page loaders of other sessions) and sliced to the selected dates locally;
+# the first two charts are redrawn as results come in
+tasks = [
+    ("/token/transfersChart", token.get("denom"), token.get("symbol") or token.get("denom"), "Gateway")
+    for _, token in gateway_df.iterrows()
+] + [
+    ("/gmp/GMPChart", token.get("symbol"), token.get("symbol"), "ITS")
+    for _, token in its_df.iterrows()
+]
+
+futures = {
+    submit_bulk(get_token_history, endpoint, asset): i
+    for i, (endpoint, asset, _, _) in enumerate(tasks)
+}
 
+total = len(tasks)
 progress = st.progress(0)
 
-for _, token in gateway_df.iterrows():
+st.subheader("Number of Transfers by Token Over Time")
+txns_chart = st.empty()
+st.subheader("Volume of Transfers by Token Over Time")
+volume_chart = st.empty()
 
-    denom = token.get("denom")
-    symbol = token.get("symbol") or denom
+results = {}
+last_draw = time.monotonic()
 
-    raw = get_chart_data(
-        "/token/transfersChart",
-        denom,
-        from_time,
-        to_time,
-    )
+for count, future in enumerate(as_completed(futures), start=1):
+
+    i = futures[future]
+    _, _, symbol, token_type = tasks[i]
 
-    df = sanitize_chart_df(raw)
+    df = window(future.result(), from_time, to_time)
 
     if not df.empty:
         df["token"] = symbol
-        df["type"] = "Gateway"
-        results.append(df)
+        df["type"] = token_type
+        results[i] = df
 
-    count += 1
-    progress.progress(min(int(count / total * 100), 100))
-
-for _, token in its_df.iterrows():
-
-    symbol = token.get("symbol")
-
-    raw = get_chart_data(
-        "/gmp/GMPChart",
-        symbol,
-        from_time,
-        to_time,
+    progress.progress(
+        min(int(count / total * 100), 100),
+        text=f"Loaded {count}/{total} token charts",
     )
 
-    df = sanitize_chart_df(raw)
-
-    if not df.empty:
-        df["token"] = symbol
-        df["type"] = "ITS"
-        results.append(df)
+    if results and count < total and time.monotonic() - last_draw >= STREAM_INTERVAL:
+        _, partial_grouped = token_dataset(list(results.values()), freq)
+        txns_chart.plotly_chart(
+            token_chart(partial_grouped, "num_txs"),
+            use_container_width=True,
+            key=f"txns_{count}",
+        )
+        volume_chart.plotly_chart(
+            token_chart(partial_grouped, "volume"),
+            use_container_width=True,
+            key=f"volume_{count}",
+        )
+        last_draw = time.monotonic()
 
-    count += 1
-    progress.progress(min(int(count / total * 100), 100))
+# Keep the original token order (gateway, then ITS) for the final charts
+results = [results[i] for i in sorted(results)]
 
 # =====================================================
 # Validation
@@ -353,82 +281,23 @@ if not results:
 # =====================================================
 # Main Dataset
 # =====================================================
-full_df = pd.concat(
-    results,
-    ignore_index=True,
-    sort=False
-)
-
-full_df["num_txs"] = (
-    pd.to_numeric(full_df["num_txs"], errors="coerce")
-    .fillna(0)
-    .astype(float)
-)
-
-full_df["volume"] = (
-    pd.to_numeric(full_df["volume"], errors="coerce")
-    .fillna(0)
-    .astype(float)
-)
-
-full_df = full_df.set_index("timestamp")
-
-# XRP adjustment
-mask_xrp = (
-    full_df["token"]
-    .astype(str)
-    .str.upper()
-    .eq("XRP")
-)
-
-full_df.loc[
-    mask_xrp,
-    ["num_txs", "volume"]
-] = (
-    full_df.loc[
-        mask_xrp,
-        ["num_txs", "volume"]
-    ] / 2.0
-)
-
-# =====================================================
-# Aggregation
-# =====================================================
-grouped = (
-    full_df
-    .groupby(["token", "type"])
-    .resample(freq)[["num_txs", "volume"]]
-    .sum()
-    .reset_index()
-)
+full_df, grouped = token_dataset(results, freq)
 
 # =====================================================
 # Charts
 # =====================================================
-st.subheader("Number of Transfers by Token Over Time")
-
-fig = px.bar(
-    grouped,
-    x="timestamp",
-    y="num_txs",
-    color="token",
-    barmode="stack",
+txns_chart.plotly_chart(
+    token_chart(grouped, "num_txs"),
+    use_container_width=True,
+    key="txns",
 )
 
-st.plotly_chart(fig, use_container_width=True)
-
-st.subheader("Volume of Transfers by Token Over Time")
-
-fig = px.bar(
-    grouped,
-    x="timestamp",
-    y="volume",
-    color="token",
-    barmode="stack",
+volume_chart.plotly_chart(
+    token_chart(grouped, "volume"),
+    use_container_width=True,
+    key="volume",
 )
 
-st.plotly_chart(fig, use_container_width=True)
-
 totals = (
     grouped
     .groupby("token")[["num_txs", "volume"]]
@@ -476,13 +345,7 @@ with col2:
         use_container_width=True
     )
 
-agg_type_time = (
-    full_df
-    .groupby("type")
-    .resample(freq)[["num_txs", "volume"]]
-    .sum()
-    .reset_index()
-)
+agg_type_time = type_series(full_df, freq)
 
 st.subheader("Number of Transfers by ITS vs Gateway Over Time")
 
@@ -2,7 +2,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objs as go
 import streamlit as st
-import requests
+from utils.http_client import AXELARSCAN_API, LLAMA_API, get, fetch_all
+from utils.swr import swr, updated_caption
+from utils.prep import flatten_tvl
 
 # --- Page Config: Tab Title & Icon ---
 st.set_page_config(
@@ -65,10 +67,10 @@ st.plotly_chart(fig1, use_container_width=True)
 # --- Row 2+ ----------------------------------------------------------------------------------------------------------------------------------------------------------
 
 # --- Load API Data ---
-@st.cache_data(ttl=3600)
+@swr(ttl=3600, max_stale=6 * 3600)
 def load_axelar_api():
-    url = "https://api.axelarscan.io/api/getTVL"  
-    response = requests.get(url)
+    url = f"{AXELARSCAN_API}/api/getTVL"
+    response = get(url)
     if response.status_code == 200:
         return response.json()
     else:
@@ -79,40 +81,7 @@ data = load_axelar_api()
 
 # --- Parse Data ---
 if data and "data" in data:
-    rows = []
-    for asset in data["data"]:
-        asset_id = asset.get("asset", "")
-        price = asset.get("price", None)
-        total = asset.get("total", None)
-        value = asset.get("value", None)
-        asset_type = asset.get("assetType", "")
-        abnormal = asset.get("is_abnormal_supply", False)
-
-        tvl_data = asset.get("tvl", {})
-        for chain, details in tvl_data.items():
-            total_tvl = details.get("total", None)
-            rows.append({
-                "Asset ID": asset_id,
-                "Asset Type": asset_type,
-                "Chain": chain,
-                "Token Symbol": details.get("contract_data", {}).get("symbol") if "contract_data" in details else None,
-                "Token Name": details.get("contract_data", {}).get("name") if "contract_data" in details else None,
-                "Contract Address": details.get("contract_data", {}).get("contract_address") if "contract_data" in details else None,
-                "Gateway Address": details.get("gateway_address", None),
-                "Supply": details.get("supply", None),
-                "Total TVL": total_tvl,
-                "Price (USD)": price,
-                "TVL (USD)": round(total_tvl * price, 0) if total_tvl is not None and price is not None else None,
-                "Total Asset Value (USD)": value,
-                "Is Abnormal?": abnormal
-            })
-
-    df = pd.DataFrame(rows)
-
-    # --- Format Numbers ---
-    numeric_cols = ["Supply", "Total TVL", "Price (USD)", "TVL (USD)", "Total Asset Value (USD)"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = flatten_tvl(data["data"])
 
 else:
     st.warning("No data available from API.")
@@ -122,17 +91,14 @@ unique_assets = df.drop_duplicates(subset=["Asset ID"])
 total_axelar_tvl = unique_assets["Total Asset Value (USD)"].sum()
 
 # --- Load AXL Price & Supply API ---
-@st.cache_data(ttl=3600)
+@swr(ttl=3600, max_stale=6 * 3600)
 def load_axl_price_supply():
     try:
-        # get price
-        price_url = "https://api.axelarscan.io/api/getTokensPrice?symbol=AXL"
-        price_res = requests.get(price_url).json()
+        # get price and total supply concurrently
+        price_url = f"{AXELARSCAN_API}/api/getTokensPrice?symbol=AXL"
+        supply_url = f"{AXELARSCAN_API}/api/getTotalSupply"
+        price_res, supply_res = (response.json() for response in fetch_all([price_url, supply_url]))
         axl_price = price_res["AXL"]["price"]
-
-        # get total supply
-        supply_url = "https://api.axelarscan.io/api/getTotalSupply"
-        supply_res = requests.get(supply_url).json()
         axl_supply = float(supply_res)  # API فقط عدد برمی‌گردونه
 
         # get fdv
@@ -157,6 +123,7 @@ with col1:
         """,
         unsafe_allow_html=True
     )
+    st.caption(updated_caption(load_axelar_api.fetched_at()))
 
 with col2:
     if axl_fdv:
@@ -170,6 +137,7 @@ with col2:
             """,
             unsafe_allow_html=True
         )
+        st.caption(updated_caption(load_axl_price_supply.fetched_at()))
 
 # -----------
 
@@ -213,10 +181,10 @@ with col2:
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------
 # --- Load Chains API ---
-@st.cache_data(ttl=3600)
+@swr(ttl=3600, max_stale=6 * 3600)
 def load_chains_api():
-    url = "https://api.llama.fi/v2/chains"
-    response = requests.get(url)
+    url = f"{LLAMA_API}/v2/chains"
+    response = get(url)
     if response.status_code == 200:
         return response.json()
     else:
@@ -250,6 +218,7 @@ st.dataframe(
     }),
     use_container_width=True
 )
+st.caption(updated_caption(load_chains_api.fetched_at()))
 
 # ----------------------------------------------------------------------------------------------------------------------------
 top_20_chains = chains_df.head(20).reset_index()
@@ -0,0 +1,10 @@
+import sys
+
+from utils.fact_store import STORE_DIR, sync_incremental, sync_store
+
+if "--full" in sys.argv:
+    rows = sync_store()
+    print(f"Materialized {rows:,} axelar_service rows into {STORE_DIR}.")
+else:
+    rows = sync_incremental()
+    print(f"Upserted {rows:,} new or updated axelar_service rows into {STORE_DIR}.")
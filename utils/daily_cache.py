@@ -0,0 +1,200 @@
+"""Range-composable cache of per-day additive aggregates.
+
+A ``DailyAggregate`` holds one row per (day, dims...) with additive measures
+(counts, sums, non-null counts for averages). It is stored locally as
+Parquet, and any date range is answered by summing the cached daily partials.
+Only days that are not cached yet are fetched, in contiguous runs, so moving
+a date picker by a day costs at most one small query.
+
+Recent days can still change: rows arrive late and the store is re-synced
+with an overlap. A day's partials therefore only count as final when the
+data they were computed from was current ``settle_days`` after the day
+ended. Each cached day records when its source was current: the fetch time
+for a live warehouse, or the last sync of a local store (``synced_at``),
+which can lag while a background sync runs. Unsettled partials are
+re-fetched once the store has synced again, or, without ``synced_at``,
+once they are older than ``refresh_after`` seconds.
+
+The coverage (which days are cached, and as of when) is stored in the
+Parquet file's metadata, so data and coverage are always replaced
+together. The parsed file is kept in memory and only re-read when its
+mtime changes.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.settings import DATA_DIR, tmp_suffix
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+DAILY_DIR = DATA_DIR / "daily"
+SETTLE_DAYS = 2              # days after which a day's partials are final
+REFRESH_AFTER = 15 * 60      # seconds before unsettled partials are re-fetched
+
+COVERAGE_KEY = b"axelar.coverage"
+
+_locks = {}
+_locks_guard = threading.Lock()
+_loaded = {}    # data path -> (version, data, coverage); guarded by the store's name lock
+
+
+def _lock_for(name):
+    with _locks_guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def _version(path):
+    # Changes whenever the file is replaced, by this process or another one
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def truncate(dates, timeframe):
+    """``date_trunc`` for a datetime Series: day, week (starting Monday) or month."""
+    dates = pd.to_datetime(dates)
+    if timeframe == "week":
+        return dates.dt.to_period("W").dt.start_time
+    if timeframe == "month":
+        return dates.dt.to_period("M").dt.start_time
+    return dates.dt.normalize()
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _runs(days):
+    """Group sorted dates into contiguous ``(first, last)`` runs."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+class DailyAggregate:
+    """Per-day additive partials of ``query``, cached on disk and summed over any range.
+
+    ``query`` is a SQL template with ``{start}`` and ``{end}`` placeholders
+    (inclusive ``YYYY-MM-DD`` dates). It must return a ``day`` column, the
+    ``dims`` columns and the additive ``measures``. ``run`` executes the SQL
+    and returns a DataFrame. When ``run`` reads a synced copy of the data,
+    ``synced_at`` returns the epoch seconds of its last sync (``None`` before
+    the first one).
+    """
+
+    def __init__(self, name, query, run, dims=(), measures=(), settle_days=SETTLE_DAYS, refresh_after=REFRESH_AFTER,
+                 synced_at=None):
+        self.name = name
+        self.query = query
+        self.run = run
+        self.dims = list(dims)
+        self.measures = list(measures)
+        self.settle_days = settle_days
+        self.refresh_after = refresh_after
+        self.synced_at = synced_at
+        self._data_path = DAILY_DIR / f"{name}.parquet"
+
+    # --- Storage ---
+    def _read(self):
+        """The stored partials and coverage; callers must not modify them (they are shared)."""
+        try:
+            version = _version(self._data_path)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=["day"] + self.dims + self.measures), {}
+        loaded = _loaded.get(self._data_path)
+        if loaded and loaded[0] == version:
+            return loaded[1], loaded[2]
+        try:
+            table = pq.read_table(self._data_path)
+            coverage = json.loads((table.schema.metadata or {}).get(COVERAGE_KEY, b"{}"))
+        except (OSError, ValueError, pa.ArrowException):
+            return pd.DataFrame(columns=["day"] + self.dims + self.measures), {}
+        data = table.to_pandas()
+        data["day"] = pd.to_datetime(data["day"]).dt.date
+        coverage = {date.fromisoformat(day): current_at for day, current_at in coverage.items()}
+        _loaded[self._data_path] = (version, data, coverage)
+        return data, coverage
+
+    def _write(self, data, coverage):
+        DAILY_DIR.mkdir(parents=True, exist_ok=True)
+        data_tmp = self._data_path.with_suffix(tmp_suffix())
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), COVERAGE_KEY: json.dumps(
+            {day.isoformat(): current_at for day, current_at in coverage.items()}).encode()}
+        pq.write_table(table.replace_schema_metadata(metadata), data_tmp)
+        os.replace(data_tmp, self._data_path)
+        _loaded[self._data_path] = (_version(self._data_path), data, coverage)
+
+    # --- Refresh ---
+    def _source_time(self, now):
+        """When the data ``run`` reads was current: now for a live source, else its last sync."""
+        if self.synced_at is None:
+            return now
+        synced_at = self.synced_at()
+        return 0.0 if synced_at is None else min(synced_at, now)
+
+    def _needs_fetch(self, day, coverage, source_time):
+        current_at = coverage.get(day)
+        if current_at is None:
+            return True
+        settled_at = datetime.combine(day + timedelta(days=1 + self.settle_days), datetime.min.time()).timestamp()
+        if current_at >= settled_at:
+            return False
+        if self.synced_at is None:
+            return source_time - current_at > self.refresh_after
+        return source_time > current_at
+
+    def _fetch(self, first, last):
+        df = self.run(self.query.format(start=first.isoformat(), end=last.isoformat()))
+        df.columns = [c.lower() for c in df.columns]
+        df["day"] = pd.to_datetime(df["day"]).dt.date
+        return df[["day"] + self.dims + self.measures]
+
+    def daily(self, start_date, end_date):
+        """Daily partials between ``start_date`` and ``end_date`` (inclusive), fetching missing days."""
+        start_date, end_date = _as_date(start_date), min(_as_date(end_date), date.today())
+        if end_date < start_date:
+            return pd.DataFrame(columns=["day"] + self.dims + self.measures)
+        with _lock_for(self.name):
+            data, coverage = self._read()
+            # Read before fetching: a sync that lands during the fetch must not make its days look final
+            source_time = self._source_time(time.time())
+            days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+            missing = [day for day in days if self._needs_fetch(day, coverage, source_time)]
+            if missing:
+                fetched = [self._fetch(first, last) for first, last in _runs(missing)]
+                # Empty frames are left out: concatenating them would turn every column into object
+                parts = [df for df in [data[~data["day"].isin(missing)]] + fetched if len(df)]
+                data = pd.concat(parts, ignore_index=True) if parts else fetched[0]
+                coverage = {**coverage, **{day: source_time for day in missing}}
+                self._write(data, coverage)
+        in_range = (data["day"] >= start_date) & (data["day"] <= end_date)
+        return data[in_range].reset_index(drop=True)
+
+    # --- Composition ---
+    def totals(self, start_date, end_date, by=None):
+        """Measures summed over the range, grouped by ``by`` (defaults to all dims)."""
+        by = self.dims if by is None else list(by)
+        df = self.daily(start_date, end_date)
+        if not by:
+            return df[self.measures].sum().to_frame().T
+        return df.groupby(by, as_index=False, dropna=False)[self.measures].sum()
+
+    def series(self, start_date, end_date, timeframe, by=()):
+        """Measures summed per ``timeframe`` period (day / week / month) and ``by`` dims."""
+        df = self.daily(start_date, end_date)
+        df = df.assign(period=truncate(df["day"], timeframe))
+        return df.groupby(["period"] + list(by), as_index=False, dropna=False)[self.measures].sum()
@@ -0,0 +1,149 @@
+"""Local DuckDB stand-in for the Snowflake warehouse.
+
+With ``AXELAR_SQL_BACKEND=duckdb``, ``run_query`` and ``iter_query`` run
+against a local DuckDB database instead of Snowflake. It holds the same
+``axelar.<schema>.<table>`` fact tables, seeded with synthetic rows, so
+every page's query path works offline and without warehouse credits.
+
+The pages keep their Snowflake SQL. Each query is translated with
+``sqlglot`` (Snowflake to DuckDB dialect), and three differences are then
+patched by hand:
+
+- ``variant::STRING`` yields the bare string rather than its JSON text.
+- ``IS_OBJECT`` and ``IS_ARRAY`` become macros over ``json_type``.
+- Unquoted output names come back upper-cased, as Snowflake returns them.
+
+The database file is ``AXELAR_DUCKDB_PATH`` (default
+``data/warehouse.duckdb``) and is attached read-only as the ``axelar``
+catalog. ``create_tables`` lays out empty tables with the columns the
+pages read, and ``bench.synthetic`` fills them.
+"""
+import functools
+import os
+import threading
+from pathlib import Path
+
+import duckdb
+import sqlglot
+from sqlglot import exp
+
+from utils.settings import DATA_DIR
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+WAREHOUSE_PATH = Path(os.environ.get("AXELAR_DUCKDB_PATH", DATA_DIR / "warehouse.duckdb"))
+BATCH_ROWS = 100_000    # rows per DataFrame yielded by iter_batches
+
+# Columns of the Snowflake tables that the pages read; VARIANT columns are JSON
+TABLES = {
+    "axelscan.fact_gmp": {
+        "id": "VARCHAR", "created_at": "TIMESTAMP", "status": "VARCHAR", "simplified_status": "VARCHAR",
+        "event": "VARCHAR", "data": "JSON", "call": "JSON",
+    },
+    "axelscan.fact_transfers": {
+        "id": "VARCHAR", "created_at": "TIMESTAMP", "status": "VARCHAR", "simplified_status": "VARCHAR",
+        "sender_address": "VARCHAR", "data": "JSON",
+    },
+    "gov.fact_staking": {
+        "block_timestamp": "TIMESTAMP", "tx_id": "VARCHAR", "tx_succeeded": "BOOLEAN", "action": "VARCHAR",
+        "currency": "VARCHAR", "amount": "DOUBLE", "delegator_address": "VARCHAR", "validator_address": "VARCHAR",
+    },
+    "core.fact_blocks": {
+        "block_id": "BIGINT", "block_timestamp": "TIMESTAMP", "tx_count": "BIGINT",
+    },
+    "core.fact_transactions": {
+        "block_timestamp": "TIMESTAMP", "tx_id": "VARCHAR", "tx_from": "VARCHAR", "tx_succeeded": "BOOLEAN",
+    },
+}
+
+MACROS = [
+    "CREATE OR REPLACE MACRO is_object(v) AS json_type(v) = 'OBJECT'",
+    "CREATE OR REPLACE MACRO is_array(v) AS json_type(v) = 'ARRAY'",
+]
+
+
+def create_tables(con, catalog=None):
+    """Create any missing fact table (empty) in ``con``, optionally inside ``catalog``."""
+    prefix = f"{catalog}." if catalog else ""
+    for name, columns in TABLES.items():
+        schema = name.split(".")[0]
+        con.execute(f"CREATE SCHEMA IF NOT EXISTS {prefix}{schema}")
+        ddl = ", ".join(f"{column} {dtype}" for column, dtype in columns.items())
+        con.execute(f"CREATE TABLE IF NOT EXISTS {prefix}{name} ({ddl})")
+
+
+# --- Translation -------------------------------------------------------------------------------------------------------
+def _unquote_variant_strings(node):
+    # CAST(data -> '$.path' AS TEXT) keeps the JSON quotes; Snowflake's ::STRING does not
+    if isinstance(node, exp.Cast) and node.to.is_type(*exp.DataType.TEXT_TYPES) and isinstance(node.this, exp.JSONExtract):
+        return exp.JSONExtractScalar(this=node.this.this, expression=node.this.expression)
+    return node
+
+
+@functools.lru_cache(maxsize=512)
+def translate(query):
+    """``(duckdb_sql, quoted)``: the query in DuckDB's dialect and its output names that were quoted."""
+    tree = sqlglot.parse_one(query, read="snowflake")
+    quoted = set()
+    for select in tree.selects:
+        identifier = select.args.get("alias") if isinstance(select, exp.Alias) else select.args.get("this")
+        if isinstance(identifier, exp.Identifier) and identifier.quoted:
+            quoted.add(identifier.name)
+    tree = tree.transform(_unquote_variant_strings)
+    return tree.sql(dialect="duckdb"), frozenset(quoted)
+
+
+def _snowflake_names(df, quoted):
+    return df.rename(columns={c: c if c in quoted else c.upper() for c in df.columns})
+
+
+# --- Execution ---------------------------------------------------------------------------------------------------------
+_duck = None
+_duck_lock = threading.Lock()
+_queries = 0
+
+
+def query_count():
+    """Number of queries run against the warehouse by this process (for load tests)."""
+    return _queries
+
+
+def _connection():
+    # Called once per query, so it also keeps the count
+    global _duck, _queries
+    with _duck_lock:
+        _queries += 1
+        if _duck is None:
+            WAREHOUSE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                # The file may be new or seeded with only some tables; add the missing ones before attaching read-only
+                with duckdb.connect(str(WAREHOUSE_PATH)) as con:
+                    create_tables(con)
+            except duckdb.IOException:
+                # Another process holds the file open, so it has already done this
+                pass
+            _duck = duckdb.connect()
+            _duck.execute(f"ATTACH '{WAREHOUSE_PATH.as_posix()}' AS axelar (READ_ONLY)")
+            for macro in MACROS:
+                _duck.execute(macro)
+        return _duck.cursor()
+
+
+def read(query):
+    """Run Snowflake SQL against the local warehouse and return a DataFrame."""
+    sql, quoted = translate(query)
+    cursor = _connection()
+    try:
+        return _snowflake_names(cursor.execute(sql).df(), quoted)
+    finally:
+        cursor.close()
+
+
+def iter_batches(query, rows=BATCH_ROWS):
+    """Like ``read``, as a stream of DataFrames of at most ``rows`` rows."""
+    sql, quoted = translate(query)
+    cursor = _connection()
+    try:
+        for batch in cursor.execute(sql).fetch_record_batch(rows):
+            yield _snowflake_names(batch.to_pandas(), quoted)
+    finally:
+        cursor.close()
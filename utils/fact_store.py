@@ -0,0 +1,304 @@
+"""Local columnar copy of the ``axelar_service`` transfer table.
+
+``axelar_service`` is the normalized UNION of ``axelar.axelscan.fact_transfers``
+and ``axelar.axelscan.fact_gmp`` (executed & received only) that the Path and
+User pages used to rebuild inside every query. It is materialized once from
+Snowflake into monthly Parquet files and queried locally with DuckDB.
+
+After the first full load the store is kept current incrementally: only rows
+newer than the stored high-water mark (minus a small overlap window) are
+pulled, and they are upserted by ``id`` into the month files they belong to.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+
+import duckdb
+import pandas as pd
+
+from utils import result_cache
+from utils.settings import DATA_DIR
+from utils.snowflake_pool import iter_query
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+STORE_DIR = DATA_DIR / "axelar_service"
+SYNC_MARKER = STORE_DIR / "_synced_at"
+MAX_AGE = 15 * 60            # seconds before the store is refreshed in the background
+OVERLAP = timedelta(hours=6)  # re-pulled behind the high-water mark to catch late status changes
+
+ITS_CONTRACTS = (
+    "0xB5FB4BE02232B1bBA4dC8f81dc24C26980dE9e3C",                        # Interchain Token Service
+    "axelar1aqcj54lzz0rk22gvqgcn8fr5tx4rzwdv5wv5j9dmnacgefvd7wzsy2j2mr",  # Axelar ITS Hub
+)
+
+# Transfers excluded from the path and user statistics
+EXCLUDED_IDS = (
+    "6f01df90bcb4d456c28d85a1f754f1c9c37b922885ea61f915e013aa8a20a5c6_osmosis",
+    "0b2b03ecd8c48bb3342754a401240fe5e421a3d74a40def8c1b77758a1976f52_osmosis",
+    "21074a86b299d4eaff74645ab8edc22aa3639a36e82df8e7fddfb3c78e8c7250_osmosis",
+    "a08cb0274fedf0594f181e6223418f1e7354c5da5285f493eeec70e4379f01bc_kujira",
+    "ba0ef39d7fb9b5c7650f2ea982ffb9a1f91263ce899ba1e8b13c161d0bca5e3b_secret-snip",
+    "efc018a03cdcfdb25f90d68fc2b06bee6c50c93c4d47ea1343148ea2444652b8_evmos",
+    "8e0bc8b78fd2da8b1795752fa98a4775f5dc19dca319b59ebc8a0ac80f39cfe1_osmosis",
+    "8eb3363bcf6776bbab9e168662173d6b24aca66f673a7f70ebebacae2d94e575_osmosis",
+    "71208b721ada14e26e48386396db03c7099603f452129805fa06442fb712ce85_archway",
+    "41e73eb192d4f9c81248c779a990f19899ae25cd3baba24f447af225430eb73e_osmosis",
+    "12dcc41fddd2f62e24233a3cb871689ea9d9f0c83c5b3a5ad9b629455cc7ec89_osmosis",
+    "562afc565b8c2e87e4018ed96cef222f80b490734fc488fdc80891a7c6f22f55_osmosis",
+    "606769d9cd0da39bcc93beb414c6349e3d29d3efd623e0b0829f4805438a3433_crescent",
+    "928031faa78c67fb1962822b3105cd359edb936751dce09e2fd807995363d3bc_osmosis",
+    "274969809c986ecf98013cd24b56c071df3c68b36a1c243410e866bb5b1304be_kujira",
+    "0xfd829bdb624a29b11a54c561d7ce80403607a79a3b4f0c6847dd4f8426274d26-121526",
+    "b2eb91cd813b6d107b6e3d526296d464c4e810e3ae02e0d24a1d193deb600d4b_archway",
+    "14115388d61f886dc1abbc2ae4cf9f68271d29605137333f9687229af671e3fc_kujira",
+)
+EXCLUDED_IDS_FILTER = "id not in (" + ", ".join(f"'{i}'" for i in EXCLUDED_IDS) + ")"
+
+COLUMNS = [
+    "created_at", "source_chain", "destination_chain", "user", "amount", "amount_usd",
+    "fee", "id", "service", "raw_asset", "is_its",
+]
+DTYPES = {
+    "created_at": "datetime64[ns]", "source_chain": "str", "destination_chain": "str", "user": "str",
+    "amount": float, "amount_usd": float, "fee": float, "id": "str", "service": "str", "raw_asset": "str",
+    "is_its": bool,
+}
+EMPTY_MONTH = "none"          # partition written when a full sync returns no rows
+
+# --- Snowflake Source --------------------------------------------------------------------------------------------------
+_ITS_PREDICATE = " or ".join(
+    f"data:approved:returnValues:contractAddress ilike '%{address}%'" for address in ITS_CONTRACTS
+)
+
+AXELAR_SERVICE_QUERY = f"""
+SELECT
+  created_at,
+  LOWER(data:send:original_source_chain) AS source_chain,
+  LOWER(data:send:original_destination_chain) AS destination_chain,
+  sender_address AS user,
+  CASE
+    WHEN IS_ARRAY(data:send:amount) OR IS_OBJECT(data:send:amount) THEN NULL
+    ELSE TRY_TO_DOUBLE(data:send:amount::STRING)
+  END AS amount,
+  CASE
+    WHEN IS_ARRAY(data:send:amount) OR IS_ARRAY(data:link:price) THEN NULL
+    WHEN IS_OBJECT(data:send:amount) OR IS_OBJECT(data:link:price) THEN NULL
+    ELSE TRY_TO_DOUBLE(data:send:amount::STRING) * TRY_TO_DOUBLE(data:link:price::STRING)
+  END AS amount_usd,
+  CASE
+    WHEN IS_ARRAY(data:send:fee_value) OR IS_OBJECT(data:send:fee_value) THEN NULL
+    ELSE TRY_TO_DOUBLE(data:send:fee_value::STRING)
+  END AS fee,
+  id,
+  'Token Transfers' AS service,
+  data:link:asset::STRING AS raw_asset,
+  FALSE AS is_its
+FROM axelar.axelscan.fact_transfers
+WHERE status = 'executed' AND simplified_status = 'received' {{where}}
+
+UNION ALL
+
+SELECT
+  created_at,
+  LOWER(data:call.chain::STRING) AS source_chain,
+  LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain,
+  data:call.transaction.from::STRING AS user,
+  CASE
+    WHEN IS_ARRAY(data:amount) OR IS_OBJECT(data:amount) THEN NULL
+    ELSE TRY_TO_DOUBLE(data:amount::STRING)
+  END AS amount,
+  CASE
+    WHEN IS_ARRAY(data:value) OR IS_OBJECT(data:value) THEN NULL
+    ELSE TRY_TO_DOUBLE(data:value::STRING)
+  END AS amount_usd,
+  COALESCE(
+    CASE
+      WHEN IS_ARRAY(data:gas:gas_used_amount) OR IS_OBJECT(data:gas:gas_used_amount)
+        OR IS_ARRAY(data:gas_price_rate:source_token.token_price.usd) OR IS_OBJECT(data:gas_price_rate:source_token.token_price.usd)
+      THEN NULL
+      ELSE TRY_TO_DOUBLE(data:gas:gas_used_amount::STRING) * TRY_TO_DOUBLE(data:gas_price_rate:source_token.token_price.usd::STRING)
+    END,
+    CASE
+      WHEN IS_ARRAY(data:fees:express_fee_usd) OR IS_OBJECT(data:fees:express_fee_usd) THEN NULL
+      ELSE TRY_TO_DOUBLE(data:fees:express_fee_usd::STRING)
+    END
+  ) AS fee,
+  id,
+  'GMP' AS service,
+  data:symbol::STRING AS raw_asset,
+  COALESCE({_ITS_PREDICATE}, FALSE) AS is_its
+FROM axelar.axelscan.fact_gmp
+WHERE status = 'executed' AND simplified_status = 'received' {{where}}
+"""
+
+
+def _normalize_batch(df):
+    df.columns = [c.lower() for c in df.columns]
+    df["created_at"] = pd.to_datetime(df["created_at"])
+    df["is_its"] = df["is_its"].astype(bool)
+    return df[COLUMNS]
+
+
+def fetch_axelar_service(where=""):
+    """Pull normalized ``axelar_service`` rows from Snowflake.
+
+    ``where`` is an extra predicate (starting with ``AND``) applied to both
+    halves of the union. Rows are streamed in Arrow batches and normalized
+    batch by batch.
+    """
+    batches = [_normalize_batch(batch) for batch in iter_query(AXELAR_SERVICE_QUERY.format(where=where))]
+    if not batches:
+        return pd.DataFrame(columns=COLUMNS).astype(DTYPES)
+    return pd.concat(batches, ignore_index=True)
+
+
+# --- Parquet Store -----------------------------------------------------------------------------------------------------
+def _month_path(month):
+    return STORE_DIR / f"month={month}.parquet"
+
+
+def _write_month(month, part):
+    path = _month_path(month)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    part.sort_values("created_at").to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def write_months(df):
+    """Write ``df`` as one Parquet file per month, atomically replacing existing files.
+
+    An empty ``df`` is written as one empty partition, so the store exists
+    and the local view has its columns.
+    """
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    if df.empty:
+        _write_month(EMPTY_MONTH, df.astype(DTYPES))
+        return {EMPTY_MONTH}
+    months = df["created_at"].dt.strftime("%Y-%m")
+    for month, part in df.groupby(months, sort=True):
+        _write_month(month, part)
+    return set(months.unique())
+
+
+def upsert_months(df):
+    """Merge ``df`` into the month files it touches, replacing rows with the same ``id``."""
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    df = df.drop_duplicates(subset="id", keep="last")
+    months = df["created_at"].dt.strftime("%Y-%m")
+    for month, part in df.groupby(months, sort=True):
+        path = _month_path(month)
+        if path.exists():
+            stored = pd.read_parquet(path)
+            stored = stored[~stored["id"].isin(part["id"])]
+            part = pd.concat([stored, part], ignore_index=True)
+        _write_month(month, part)
+    return set(months.unique())
+
+
+def store_exists():
+    return any(STORE_DIR.glob("month=*.parquet"))
+
+
+def last_synced_at():
+    try:
+        return float(SYNC_MARKER.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _mark_synced():
+    SYNC_MARKER.write_text(str(time.time()))
+
+
+def high_water_mark():
+    """Latest ``created_at`` held locally, or ``None`` when the store is empty."""
+    months = sorted(STORE_DIR.glob("month=*.parquet"))
+    if not months:
+        return None
+    latest = pd.read_parquet(months[-1], columns=["created_at"])["created_at"].max()
+    return None if pd.isna(latest) else latest
+
+
+def sync_store():
+    """Materialize the full ``axelar_service`` history into the local store."""
+    df = fetch_axelar_service()
+    written = write_months(df)
+    for path in STORE_DIR.glob("month=*.parquet"):
+        if path.stem.split("=", 1)[1] not in written:
+            path.unlink()
+    _mark_synced()
+    return len(df)
+
+
+def sync_incremental(overlap=OVERLAP):
+    """Pull rows created since the high-water mark (minus ``overlap``) and upsert them by ``id``."""
+    hwm = high_water_mark()
+    if hwm is None:
+        return sync_store()
+    since = (hwm - overlap).strftime("%Y-%m-%d %H:%M:%S")
+    df = fetch_axelar_service(where=f"AND created_at >= '{since}'")
+    if not df.empty:
+        upsert_months(df)
+    _mark_synced()
+    return len(df)
+
+
+_sync_lock = threading.Lock()
+
+
+def _sync_in_background():
+    if not _sync_lock.acquire(blocking=False):
+        return
+    def run():
+        try:
+            sync_incremental()
+        finally:
+            _sync_lock.release()
+    threading.Thread(target=run, name="axelar-service-sync", daemon=True).start()
+
+
+def ensure_store(max_age=MAX_AGE):
+    """Build the store if it is missing; top it up in the background when stale."""
+    if not store_exists():
+        with _sync_lock:
+            if not store_exists():
+                sync_store()
+        return
+    synced_at = last_synced_at()
+    if synced_at is None or time.time() - synced_at > max_age:
+        _sync_in_background()
+
+
+# --- Local Queries -----------------------------------------------------------------------------------------------------
+_duck = None
+_duck_lock = threading.Lock()
+
+
+def _local_connection():
+    global _duck
+    with _duck_lock:
+        if _duck is None:
+            _duck = duckdb.connect()
+            _duck.execute(
+                f"CREATE VIEW axelar_service AS SELECT * FROM read_parquet('{STORE_DIR.as_posix()}/month=*.parquet')"
+            )
+        return _duck.cursor()
+
+
+def _read_local(query):
+    cursor = _local_connection()
+    try:
+        return cursor.execute(query).df()
+    finally:
+        cursor.close()
+
+
+def query_local(query, ttl=MAX_AGE):
+    """Run DuckDB SQL against the local ``axelar_service`` view and return a DataFrame.
+
+    Results go through the on-disk result cache for ``ttl`` seconds, matching
+    the store's refresh interval.
+    """
+    ensure_store()
+    return result_cache.cached(query, _read_local, ttl=ttl, namespace="duckdb")
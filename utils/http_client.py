@@ -0,0 +1,169 @@
+"""Shared HTTP client for the Axelarscan and DefiLlama APIs.
+
+All pages go through one pooled ``httpx.AsyncClient``: connections are kept
+alive and reused, HTTP/2 is negotiated when the ``h2`` package is
+installed, every request has a timeout, and transient failures (connection
+errors, 429 and 5xx) are retried with jittered exponential backoff. Each
+host gets at most ``HOST_CONCURRENCY`` requests in flight and
+``HOST_RATE`` new requests per second, however many pages and threads are
+fetching at once.
+
+The client lives on a background event loop shared by the whole process.
+The loop, the client, the per-host limiters and the in-flight requests are
+one module singleton rather than a ``st.cache_resource``: clearing
+Streamlit's caches must not start a second loop while the first one's
+client and asyncio objects are still in use.
+``get`` is the blocking call for page code, ``fetch_all`` fetches several
+URLs concurrently, and ``aget`` is the coroutine both are built on.
+Identical GETs already in flight are coalesced: later callers await the
+first request instead of sending their own. Responses are ``httpx.Response`` objects (``status_code``, ``json()``,
+``text``, ``raise_for_status()``).
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+
+import httpx
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+AXELARSCAN_API = os.environ.get("AXELARSCAN_API_URL", "https://api.axelarscan.io").rstrip("/")
+LLAMA_API = os.environ.get("LLAMA_API_URL", "https://api.llama.fi").rstrip("/")
+
+TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+RETRIES = 3                              # retries after the first attempt
+BACKOFF = 0.5                            # seconds; doubled on every retry, with jitter
+MAX_RETRY_AFTER = BACKOFF * 2 ** RETRIES   # longest Retry-After honored; longer ones fail the request
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HOST_CONCURRENCY = int(os.environ.get("AXELAR_HTTP_HOST_CONCURRENCY", 16))  # requests in flight per host
+HOST_RATE = float(os.environ.get("AXELAR_HTTP_HOST_RATE", 20))               # requests started per second per host
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class _HostLimiter:
+    """Caps the requests in flight to one host and spaces out their start times."""
+
+    def __init__(self):
+        self.slots = asyncio.Semaphore(HOST_CONCURRENCY)
+        self.next_start = 0.0
+
+    async def __aenter__(self):
+        await self.slots.acquire()
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.next_start)
+        self.next_start = start + 1 / HOST_RATE
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc_info):
+        self.slots.release()
+
+
+class _Runtime:
+    """The event loop (in a daemon thread) and everything bound to it.
+
+    ``client``, ``limiters`` and ``inflight`` are only touched from ``loop``,
+    so they need no lock.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(http2=HTTP2, timeout=TIMEOUT, limits=LIMITS, follow_redirects=True)
+        self.limiters = {}
+        self.inflight = {}
+        threading.Thread(target=self.loop.run_forever, name="http-client", daemon=True).start()
+
+    def limiter(self, url):
+        host = httpx.URL(url).host
+        if host not in self.limiters:
+            self.limiters[host] = _HostLimiter()
+        return self.limiters[host]
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def _runtime():
+    """The process-wide ``_Runtime``, created on first use."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = _Runtime()
+        return _instance
+
+
+def _delay(attempt, response=None):
+    """Seconds to wait before the next attempt, or ``None`` when the server wants us to wait too long."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after) if float(retry_after) <= MAX_RETRY_AFTER else None
+    return BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+async def aget(url, params=None, timeout=None, retries=RETRIES):
+    """GET ``url``, retrying transient failures. Returns the last response.
+
+    Connection errors are re-raised once the retries are used up, and
+    error statuses are left for the caller to check. A caller that joins an
+    identical request already in flight shares its response (and its
+    ``timeout`` / ``retries``).
+    """
+    inflight = _runtime().inflight
+    key = (url, json.dumps(params, sort_keys=True, default=str))
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(_fetch(url, params, timeout, retries))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    # A cancelled caller must not cancel the request the others are waiting on
+    return await asyncio.shield(task)
+
+
+async def _fetch(url, params, timeout, retries):
+    runtime = _runtime()
+    for attempt in range(retries + 1):
+        try:
+            async with runtime.limiter(url):
+                response = await runtime.client.get(url, params=params, timeout=timeout or TIMEOUT)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            return response
+        delay = _delay(attempt, response)
+        if delay is None:
+            # Holding the caller (and its page) for minutes is worse than the error path
+            return response
+        await asyncio.sleep(delay)
+
+
+async def agather(urls, return_exceptions=False, **kwargs):
+    requests = (aget(url, **kwargs) for url in urls)
+    return await asyncio.gather(*requests, return_exceptions=return_exceptions)
+
+
+def _run(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _runtime().loop).result()
+
+
+def get(url, params=None, timeout=None, retries=RETRIES):
+    """Blocking ``aget``."""
+    return _run(aget(url, params=params, timeout=timeout, retries=retries))
+
+
+def fetch_all(urls, **kwargs):
+    """GET every URL concurrently; responses come back in the order of ``urls``.
+
+    With ``return_exceptions=True`` a request that fails outright gives its
+    exception in place of a response instead of failing the whole call.
+    """
+    return _run(agather(list(urls), **kwargs))
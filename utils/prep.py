@@ -0,0 +1,143 @@
+"""Post-query data preparation shared by the pages and the benchmarks.
+
+These are the pandas steps that run on every page render after the data has
+been fetched: resampling chart series, flattening nested API payloads and
+binning distributions. They are plain functions of their inputs (no
+Streamlit, no I/O), so ``bench.benchmarks`` can time the code the pages
+actually run against fixtures of any size.
+"""
+import pandas as pd
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+PERIOD_CODES = {"week": "W", "month": "M"}
+
+
+# --- GMP & Token Transfers ---------------------------------------------------------------------------------------------
+def period_start(timestamps, timeframe):
+    """Start of the week or month containing each timestamp; the day itself for ``day``."""
+    if timeframe == "day":
+        return timestamps.dt.normalize()
+    return timestamps.dt.to_period(PERIOD_CODES[timeframe]).apply(lambda r: r.start_time)
+
+
+def interchain_totals(df, timeframe):
+    """interchainChart points summed per period, with GMP + transfer ``total_txs`` and ``total_volume``."""
+    df = df.assign(period=period_start(df["timestamp"], timeframe))
+    grouped = df.groupby("period").sum(numeric_only=True).reset_index()
+    grouped["total_txs"] = grouped["gmp_num_txs"] + grouped["transfers_num_txs"]
+    grouped["total_volume"] = grouped["gmp_volume"] + grouped["transfers_volume"]
+    return grouped
+
+
+# --- Asset Analysis ----------------------------------------------------------------------------------------------------
+def token_dataset(results, freq):
+    """Concatenate per-token chart frames and resample them per (token, type).
+
+    Returns the full frame indexed by timestamp and the grouped series.
+    """
+    full_df = pd.concat(results, ignore_index=True, sort=False)
+    full_df["num_txs"] = pd.to_numeric(full_df["num_txs"], errors="coerce").fillna(0).astype(float)
+    full_df["volume"] = pd.to_numeric(full_df["volume"], errors="coerce").fillna(0).astype(float)
+    full_df = full_df.set_index("timestamp")
+
+    # XRP is counted on both legs of its transfers
+    mask_xrp = full_df["token"].astype(str).str.upper().eq("XRP")
+    full_df.loc[mask_xrp, ["num_txs", "volume"]] = full_df.loc[mask_xrp, ["num_txs", "volume"]] / 2.0
+
+    grouped = full_df.groupby(["token", "type"]).resample(freq)[["num_txs", "volume"]].sum().reset_index()
+    return full_df, grouped
+
+
+def type_series(full_df, freq):
+    """``token_dataset``'s full frame resampled per token type (ITS / Gateway)."""
+    return full_df.groupby("type").resample(freq)[["num_txs", "volume"]].sum().reset_index()
+
+
+# --- Interchain Token Service ------------------------------------------------------------------------------------------
+def flatten_chain_stats(payloads):
+    """Source-chain, destination-chain and path totals of GMPStatsByChains responses."""
+    all_sources = []
+    all_destinations = []
+    all_paths = []
+    for data in payloads:
+        for s in data["source_chains"]:
+            all_sources.append({
+                "source_chain": s["key"],
+                "num_txs": s.get("num_txs", 0),
+                "volume": s.get("volume", 0.0),
+            })
+            for d in s["destination_chains"]:
+                all_destinations.append({
+                    "destination_chain": d["key"],
+                    "num_txs": d.get("num_txs", 0),
+                    "volume": d.get("volume", 0.0),
+                })
+                all_paths.append({
+                    "path": f"{s['key']} ➡ {d['key']}",
+                    "num_txs": d.get("num_txs", 0),
+                    "volume": d.get("volume", 0.0),
+                })
+
+    df_sources = pd.DataFrame(all_sources).groupby("source_chain", as_index=False).sum()
+    df_destinations = pd.DataFrame(all_destinations).groupby("destination_chain", as_index=False).sum()
+    df_paths = pd.DataFrame(all_paths).groupby("path", as_index=False).sum()
+    return df_sources, df_destinations, df_paths
+
+
+# --- Contract Analysis -------------------------------------------------------------------------------------------------
+def flatten_contracts(data):
+    """One row per (chain, contract) of a GMPStatsByContracts response."""
+    contracts_list = []
+    for chain in data.get("chains", []):
+        for contract in chain.get("contracts", []):
+            contracts_list.append({
+                "Chain": chain["key"],
+                "Contract": contract["key"],
+                "Number of Transactions": contract["num_txs"],
+                "Volume": contract["volume"],
+            })
+    return pd.DataFrame(contracts_list)
+
+
+def distribution(values, bins, labels):
+    """Count of ``values`` per bin (right-closed, first bin inclusive), in ``labels`` order."""
+    categories = pd.cut(values, bins=bins, labels=labels, right=True, include_lowest=True)
+    return categories.value_counts().reindex(labels)
+
+
+# --- TVL Analysis ------------------------------------------------------------------------------------------------------
+def flatten_tvl(assets):
+    """One row per (asset, chain) of the getTVL ``data`` list, with numeric columns coerced."""
+    rows = []
+    for asset in assets:
+        asset_id = asset.get("asset", "")
+        price = asset.get("price", None)
+        value = asset.get("value", None)
+        asset_type = asset.get("assetType", "")
+        abnormal = asset.get("is_abnormal_supply", False)
+
+        tvl_data = asset.get("tvl", {})
+        for chain, details in tvl_data.items():
+            total_tvl = details.get("total", None)
+            contract_data = details.get("contract_data", {})
+            rows.append({
+                "Asset ID": asset_id,
+                "Asset Type": asset_type,
+                "Chain": chain,
+                "Token Symbol": contract_data.get("symbol"),
+                "Token Name": contract_data.get("name"),
+                "Contract Address": contract_data.get("contract_address"),
+                "Gateway Address": details.get("gateway_address", None),
+                "Supply": details.get("supply", None),
+                "Total TVL": total_tvl,
+                "Price (USD)": price,
+                "TVL (USD)": round(total_tvl * price, 0) if total_tvl is not None and price is not None else None,
+                "Total Asset Value (USD)": value,
+                "Is Abnormal?": abnormal,
+            })
+
+    df = pd.DataFrame(rows)
+    numeric_cols = ["Supply", "Total TVL", "Price (USD)", "TVL (USD)", "Total Asset Value (USD)"]
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
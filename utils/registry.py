@@ -0,0 +1,107 @@
+"""Reference data shared by every page: chains, gateway assets and ITS assets.
+
+The three Axelarscan lists are fetched together, at most once per
+``REFRESH_AFTER`` seconds per process, and the lookups the pages need are
+indexed once when they load:
+
+- ``chain_names``: chain id -> chain name
+- ``symbol_by_address``: lowercase ITS token address -> symbol
+- ``logo_by_symbol``: symbol -> logo URL (ITS first, then gateway assets)
+
+``registry()`` returns the same object to every session, so pages must
+treat it as read-only.
+
+A list whose endpoint fails is logged and left empty, so the pages that
+do not need it keep working. A registry with a missing list is reloaded
+after ``RETRY_AFTER`` seconds instead of ``REFRESH_AFTER``.
+"""
+import ast
+import json
+import logging
+import time
+
+import streamlit as st
+
+from utils.http_client import AXELARSCAN_API, fetch_all
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+REFRESH_AFTER = 3600
+RETRY_AFTER = 60             # seconds before a registry with a failed endpoint is reloaded
+ENDPOINTS = {
+    "chains": "/api/getChains",
+    "gateway_assets": "/api/getAssets",
+    "its_assets": "/api/getITSAssets",
+}
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_addresses(addresses):
+    """An asset's ``addresses`` field as a list; it sometimes arrives as a serialized list."""
+    if isinstance(addresses, str):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                addresses = parse(addresses)
+                break
+            except (ValueError, SyntaxError):
+                continue
+        else:
+            return []
+    if isinstance(addresses, dict):
+        addresses = addresses.values()
+    return [address for address in addresses or [] if isinstance(address, str)]
+
+
+class Registry:
+    def __init__(self, chains, gateway_assets, its_assets, failed=()):
+        self.chains = chains
+        self.gateway_assets = gateway_assets
+        self.its_assets = its_assets
+        self.failed = set(failed)
+        self.loaded_at = time.time()
+
+        self.chain_names = {chain.get("chain_id"): chain.get("chain_name") for chain in chains}
+
+        self.symbol_by_address = {}
+        self.logo_by_symbol = {}
+        for asset in its_assets:
+            symbol = asset.get("symbol", "")
+            self.logo_by_symbol[symbol] = asset.get("image", "")
+            for address in parse_addresses(asset.get("addresses", [])):
+                self.symbol_by_address[address.lower()] = symbol
+        for asset in gateway_assets:
+            if asset.get("symbol") and not self.logo_by_symbol.get(asset["symbol"]):
+                self.logo_by_symbol[asset["symbol"]] = asset.get("image", "")
+
+    @classmethod
+    def load(cls):
+        """Fetch the three lists; an endpoint that fails gives an empty list and is recorded in ``failed``."""
+        responses = fetch_all((f"{AXELARSCAN_API}{path}" for path in ENDPOINTS.values()), return_exceptions=True)
+        data = {}
+        failed = []
+        for (name, path), response in zip(ENDPOINTS.items(), responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                response.raise_for_status()
+                data[name] = response.json()
+            except Exception as error:
+                _LOGGER.warning("Couldn't load %s, using an empty list: %s", path, error)
+                data[name] = []
+                failed.append(name)
+        return cls(**data, failed=failed)
+
+
+@st.cache_resource(ttl=REFRESH_AFTER)
+def _loaded():
+    return Registry.load()
+
+
+def registry():
+    """The process-wide ``Registry``, reloaded every ``REFRESH_AFTER`` seconds (``RETRY_AFTER`` after a failure)."""
+    loaded = _loaded()
+    if loaded.failed and time.time() - loaded.loaded_at > RETRY_AFTER:
+        _loaded.clear()
+        loaded = _loaded()
+    return loaded
@@ -0,0 +1,125 @@
+"""Disk-backed cache of query results.
+
+``@st.cache_data`` only lives in process memory, so a restart or redeploy
+re-runs every heavy query. Results stored here are Parquet files named by a
+hash of the whitespace-normalized SQL plus its parameters. They survive
+restarts and are shared by every worker process on the host.
+
+Files are written atomically (temp file + ``os.replace``). Freshness is the
+file's mtime and recency of use is its atime, which is bumped on every hit.
+When the cache grows past ``MAX_BYTES`` the least recently used files are
+evicted.
+
+Concurrent calls for the same query share one run: the first caller runs
+it and the others wait for its result, so a burst of sessions costs one
+warehouse query instead of one each.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.settings import DATA_DIR, tmp_suffix
+from utils.singleflight import Group
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+CACHE_DIR = DATA_DIR / "query_cache"
+DEFAULT_TTL = 3600                                                       # seconds a cached result stays fresh
+MAX_BYTES = int(os.environ.get("AXELAR_CACHE_MAX_BYTES", 512 * 1024 ** 2))  # total size before LRU eviction
+
+_flights = Group()
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize_sql(query):
+    """Collapse runs of whitespace outside string literals so formatting doesn't change the key."""
+    parts = _LITERAL.split(query)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip()
+
+
+def cache_key(query, params=None, namespace=""):
+    payload = json.dumps([namespace, normalize_sql(query), params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return CACHE_DIR / f"{key}.parquet"
+
+
+def get(key, ttl=DEFAULT_TTL):
+    """Return the cached DataFrame for ``key`` or ``None`` when missing or older than ``ttl``."""
+    path = _path(key)
+    try:
+        written_at = path.stat().st_mtime
+        if time.time() - written_at > ttl:
+            return None
+        df = pd.read_parquet(path)
+        os.utime(path, (time.time(), written_at))
+        return df
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+
+def put(key, df):
+    """Store ``df`` under ``key`` and evict old entries if the cache is over budget."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(key)
+    tmp_path = path.with_suffix(tmp_suffix())
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError, TypeError, pa.ArrowException):
+        # Results that can't be represented in Parquet are simply not cached
+        tmp_path.unlink(missing_ok=True)
+        return
+    evict()
+
+
+def evict(max_bytes=MAX_BYTES):
+    """Delete least recently used entries until the cache fits in ``max_bytes``."""
+    entries = []
+    for path in CACHE_DIR.glob("*.parquet"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def clear():
+    for path in CACHE_DIR.glob("*.parquet"):
+        path.unlink(missing_ok=True)
+
+
+def cached(query, run, ttl=DEFAULT_TTL, params=None, namespace=""):
+    """Return the cached result of ``query`` or compute it with ``run(query)`` and store it.
+
+    A ``ttl`` of 0 bypasses the cache, but concurrent identical calls are
+    still coalesced. Callers that shared a run each get their own copy, so
+    they can modify it freely.
+    """
+    key = cache_key(query, params, namespace)
+    df, shared = _flights.do((key, ttl), _get_or_run, key, query, run, ttl)
+    return df.copy() if shared else df
+
+
+def _get_or_run(key, query, run, ttl):
+    if not ttl:
+        return run(query)
+    df = get(key, ttl)
+    if df is None:
+        df = run(query)
+        put(key, df)
+    return df
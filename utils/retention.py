@@ -0,0 +1,190 @@
+"""Cohort retention from compact (user, period) activity pairs.
+
+Each retention heatmap only needs to know in which periods (months or
+weeks) each user was active. An ``Activity`` stores exactly that, locally,
+as (user_id: int32, period: int16) pairs, with the addresses kept once in a
+separate dictionary. The cohort x period-offset matrix is then computed
+with NumPy: ``minimum.at`` gives each user's first period and ``add.at``
+counts the active users per (cohort, offset) cell.
+
+A refresh only re-fetches the latest stored period, which may still be
+incomplete, and anything after it. A new month (or week) therefore costs
+one small query instead of a rescan of the whole table.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.settings import DATA_DIR, tmp_suffix
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+RETENTION_DIR = DATA_DIR / "retention"
+REFRESH_AFTER = 12 * 3600                     # seconds before new activity is fetched
+EPOCHS = {"month": date(2020, 1, 1), "week": date(2020, 1, 6)}  # period 0; weeks start on Monday
+COHORT_FORMATS = {"month": "%Y-%m", "week": "%Y-%m-%d"}
+
+_locks = {}
+_stores = {}
+_guard = threading.Lock()
+
+
+def _lock_for(name):
+    with _guard:
+        return _locks.setdefault(name, threading.Lock())
+
+
+def period_index(dates, period):
+    """Number of months or weeks between ``EPOCHS[period]`` and each date."""
+    dates = pd.to_datetime(pd.Series(dates))
+    epoch = pd.Timestamp(EPOCHS[period])
+    if period == "month":
+        index = (dates.dt.year - epoch.year) * 12 + dates.dt.month - epoch.month
+    else:
+        index = (dates.dt.normalize() - epoch).dt.days // 7
+    return index.to_numpy(dtype=np.int16)
+
+
+def period_start(index, period):
+    """First day of the period at ``index``."""
+    epoch = EPOCHS[period]
+    if period == "month":
+        months = epoch.month - 1 + int(index)
+        return date(epoch.year + months // 12, months % 12 + 1, 1)
+    return epoch + timedelta(weeks=int(index))
+
+
+def cohort_matrix(user_ids, periods):
+    """Active users per (cohort, offset) for distinct (user_id, period) pairs.
+
+    Returns the first cohort's period index and a (cohorts x offsets) matrix.
+    """
+    first = np.full(user_ids.max() + 1, np.iinfo(np.int16).max, dtype=np.int16)
+    np.minimum.at(first, user_ids, periods)
+    cohorts = first[user_ids]
+    offsets = periods - cohorts
+    first_cohort = int(cohorts.min())
+    counts = np.zeros((int(cohorts.max()) - first_cohort + 1, int(offsets.max()) + 1), dtype=np.int64)
+    np.add.at(counts, (cohorts - first_cohort, offsets), 1)
+    return first_cohort, counts
+
+
+class Activity:
+    """Distinct (user, period) activity of ``query``, stored compactly and refreshed incrementally.
+
+    ``query`` is a SQL template with ``{period}`` and ``{start}`` placeholders
+    returning ``user`` and ``period`` columns: the distinct users active in
+    each ``date_trunc('{period}', ...)`` from ``{start}`` on. ``run`` executes
+    the SQL and returns a DataFrame. Refreshes of a store are serialized
+    per ``name`` and period across the process; pages get their stores from
+    ``activity`` so there is one instance per process.
+    """
+
+    def __init__(self, name, query, run, period="month", refresh_after=REFRESH_AFTER):
+        self.name = f"{name}.{period}"
+        self.query = query
+        self.run = run
+        self.period = period
+        self.refresh_after = refresh_after
+        self._dir = RETENTION_DIR / self.name
+
+    # --- Storage ---
+    def _read(self):
+        try:
+            state = json.loads((self._dir / "state.json").read_text())
+            users = pd.read_parquet(self._dir / "users.parquet")["user"]
+            pairs = pd.read_parquet(self._dir / "pairs.parquet")
+        except (FileNotFoundError, ValueError):
+            return None, pd.Series(dtype=object), pd.DataFrame({"user_id": np.array([], np.int32), "period": np.array([], np.int16)})
+        return state, users, pairs
+
+    def _write(self, state, users, pairs):
+        self._dir.mkdir(parents=True, exist_ok=True)
+        suffix = tmp_suffix()
+        users.to_frame("user").to_parquet((self._dir / "users.parquet").with_suffix(suffix), index=False)
+        pairs.to_parquet((self._dir / "pairs.parquet").with_suffix(suffix), index=False)
+        (self._dir / "state.json").with_suffix(suffix).write_text(json.dumps(state))
+        for filename in ["users.parquet", "pairs.parquet", "state.json"]:
+            os.replace((self._dir / filename).with_suffix(suffix), self._dir / filename)
+
+    # --- Refresh ---
+    def _fetch(self, start):
+        df = self.run(self.query.format(period=self.period, start=start.isoformat()))
+        df.columns = [c.lower() for c in df.columns]
+        return df.dropna(subset=["user"]).drop_duplicates(["user", "period"])
+
+    def pairs(self):
+        """All stored (user_id, period) pairs, fetching new activity when the store is stale."""
+        with _lock_for(self.name):
+            state, users, pairs = self._read()
+            if state is not None and time.time() - state["fetched_at"] <= self.refresh_after:
+                return pairs
+            latest = state["latest_period"] if state else None
+            start = period_start(latest, self.period) if latest is not None else date(2000, 1, 1)
+            new = self._fetch(start)
+
+            # Map addresses to ids, appending the ones seen for the first time
+            codes = pd.Index(users).get_indexer(new["user"])
+            unseen = pd.unique(new["user"][codes < 0])
+            users = pd.concat([users, pd.Series(unseen, dtype=object)], ignore_index=True)
+            codes[codes < 0] = pd.Index(unseen).get_indexer(new["user"][codes < 0]) + len(users) - len(unseen)
+
+            new_pairs = pd.DataFrame({"user_id": codes.astype(np.int32), "period": period_index(new["period"], self.period)})
+            if latest is not None:
+                pairs = pairs[pairs["period"] < latest]
+            pairs = pd.concat([pairs, new_pairs], ignore_index=True)
+            state = {
+                "fetched_at": time.time(),
+                "latest_period": int(pairs["period"].max()) if len(pairs) else None,
+            }
+            self._write(state, users, pairs)
+            return pairs
+
+    # --- Views ---
+    def retention(self, horizon=24):
+        """``Cohort Date`` / offset / ``Retention Rate`` rows for cohorts of the last ``horizon`` periods."""
+        return cohort_retention(self.pairs(), self.period, horizon)
+
+
+def activity(name, query, run, period="month", refresh_after=REFRESH_AFTER):
+    """The process-wide ``Activity`` for ``name`` and ``period``, created on first use."""
+    with _guard:
+        key = f"{name}.{period}"
+        if key not in _stores:
+            _stores[key] = Activity(name, query, run, period, refresh_after)
+        return _stores[key]
+
+
+def cohort_retention(pairs, period, horizon=24):
+    """``Cohort Date`` / offset / ``Retention Rate`` rows of (user_id, period) pairs.
+
+    Only cohorts of the last ``horizon`` periods are kept. The offset column
+    is named after the period (``Month`` or ``Week``). Offset 0, always
+    100%, is left out.
+    """
+    offset_column = period.capitalize()
+    if pairs.empty:
+        return pd.DataFrame(columns=["Cohort Date", offset_column, "Retention Rate"])
+    first_cohort, counts = cohort_matrix(pairs["user_id"].to_numpy(), pairs["period"].to_numpy())
+
+    cohort, offset = np.nonzero(counts)
+    rates = np.round(100 * counts[cohort, offset] / counts[cohort, 0], 2)
+    current = period_index([date.today()], period)[0]
+    keep = (first_cohort + cohort >= current - horizon) & (rates != 100)
+    cohort, offset, rates = cohort[keep], offset[keep], rates[keep]
+    df = pd.DataFrame({
+        "Cohort Date": [period_start(first_cohort + c, period).strftime(COHORT_FORMATS[period]) for c in cohort],
+        offset_column: offset,
+        "Retention Rate": rates,
+    })
+    return df.sort_values(["Cohort Date", offset_column], ascending=[False, True]).reset_index(drop=True)
+
+
+def retention_pivot(df):
+    """Cohort x offset matrix of ``cohort_retention`` rows, as drawn by the heatmaps (missing cells are 0)."""
+    offset_column = df.columns[1]
+    return df.pivot_table(index="Cohort Date", columns=offset_column, values="Retention Rate", aggfunc="sum", fill_value=0)
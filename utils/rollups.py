@@ -0,0 +1,61 @@
+"""Path, source-chain and destination-chain rollups from a single scan.
+
+The path, source and destination tables are all rollups of one
+(source_chain, destination_chain) aggregation. Additive measures can be
+summed up from the path level, but distinct counts can't. ``rollup_query``
+therefore computes every level in one ``GROUP BY GROUPING SETS`` pass, which
+keeps distinct counts exact per level. The SQL runs on both Snowflake and
+DuckDB.
+"""
+import pandas as pd
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+PATH_SEPARATOR = "➡"
+LEVELS = {
+    "path": "path",
+    "source": "source_chain",
+    "destination": "destination_chain",
+}
+
+
+def rollup_query(table, where, measures):
+    """SQL computing ``measures`` per path, source chain and destination chain in one scan.
+
+    Returns ``level``, ``label`` and the measure columns. As in the per-level
+    queries it replaces, a path with a NULL end has a NULL label.
+    """
+    return f"""
+    with base as (
+    select *, (source_chain || '{PATH_SEPARATOR}' || destination_chain) as path
+    from {table}
+    where {where})
+    select case when grouping(path) = 0 then 'path' when grouping(source_chain) = 0 then 'source' else 'destination' end as level,
+    case when grouping(path) = 0 then path when grouping(source_chain) = 0 then source_chain else destination_chain end as label,
+    {measures}
+    from base
+    group by grouping sets ((path), (source_chain), (destination_chain))
+    """
+
+
+def split_levels(df):
+    """Split a ``rollup_query`` result into one DataFrame per level."""
+    df = df.copy()
+    df.columns = [c.lower() for c in df.columns]
+    return {
+        level: df[df["level"] == level].drop(columns="level").reset_index(drop=True)
+        for level in LEVELS
+    }
+
+
+def sum_levels(df, measures):
+    """Roll additive ``measures`` at (source_chain, destination_chain) grain up to every level."""
+    paths = df.assign(path=df["source_chain"] + PATH_SEPARATOR + df["destination_chain"])
+    return {
+        level: paths.groupby(column, as_index=False, dropna=False)[measures].sum().rename(columns={column: "label"})
+        for level, column in LEVELS.items()
+    }
+
+
+def top(df, column, n):
+    """The ``n`` rows with the largest ``column``."""
+    return df.sort_values(column, ascending=False).head(n).reset_index(drop=True)
@@ -0,0 +1,51 @@
+"""Run a page's independent queries concurrently.
+
+Pages submit all of their loaders up front and only block on a loader's
+result where its section is rendered. Sections still appear top to bottom,
+but page latency approaches the slowest query instead of the sum of all of
+them.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+MAX_WORKERS = 8
+BULK_WORKERS = 8    # workers for fan-outs of many small jobs, kept apart from the page loaders
+
+
+@st.cache_resource
+def _executor(name="query", max_workers=MAX_WORKERS):
+    """Process-wide worker pool shared by every session."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+
+def _call_with_ctx(ctx, fn, args, kwargs):
+    # Cached loaders need the session's script context for their spinners and cache bookkeeping
+    thread = threading.current_thread()
+    add_script_run_ctx(thread, ctx)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        add_script_run_ctx(thread, None)
+
+
+def submit(fn, *args, **kwargs):
+    """Start ``fn(*args, **kwargs)`` on the worker pool and return its ``Future``."""
+    return _executor().submit(_call_with_ctx, get_script_run_ctx(), fn, args, kwargs)
+
+
+def submit_bulk(fn, *args, **kwargs):
+    """``submit`` for one job of a large fan-out (e.g. one per token).
+
+    These run on their own bounded pool, so hundreds of them queue behind
+    each other instead of in front of every session's page loaders.
+    """
+    return _executor("bulk", BULK_WORKERS).submit(_call_with_ctx, get_script_run_ctx(), fn, args, kwargs)
+
+
+def background(fn, *args, **kwargs):
+    """Start ``fn`` on the worker pool detached from any session, for work no page waits on."""
+    return _executor().submit(fn, *args, **kwargs)
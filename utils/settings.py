@@ -0,0 +1,11 @@
+"""Settings shared by the local data stores."""
+import os
+import threading
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("AXELAR_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+
+def tmp_suffix():
+    """Suffix for a temp file written before ``os.replace``, unique to this process and thread."""
+    return f".tmp{os.getpid()}-{threading.get_ident()}"
@@ -0,0 +1,50 @@
+"""Coalesce concurrent calls for the same key into one.
+
+When several sessions miss the same cache entry at once, each of them would
+otherwise run the same warehouse query. A ``Group`` lets the first caller
+for a key (the leader) do the work, while the rest wait on it and receive
+its result or exception.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class Group:
+    """Duplicate-call suppression keyed by any hashable value."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return ``(fn(*args, **kwargs), shared)``, running ``fn`` once for all concurrent callers of ``key``.
+
+        ``shared`` is true when more than one caller received the result, in
+        which case they all hold the same object.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = Future()
+                call.waiters = 0
+                leader = True
+        if not leader:
+            return call.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            self._forget(key)
+            call.set_exception(exc)
+            raise
+        shared = self._forget(key) > 0
+        call.set_result(result)
+        return result, shared
+
+    def _forget(self, key):
+        # Later callers start a new flight; returns how many joined this one
+        with self._lock:
+            return self._calls.pop(key).waiters
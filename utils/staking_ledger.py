@@ -0,0 +1,183 @@
+"""Event-sourced ledger of AXL staked per delegator.
+
+The net staked amount on a day is the sum of every delegator's running
+balance (delegations minus undelegations) where that balance is at least
+``DUST``. Computing it in SQL meant cross joining every historic delegator
+with every day since genesis. The ledger instead keeps the daily balance
+changes locally and turns them into a series with cumulative sums: each
+change moves a delegator's counted balance from its previous value to the
+new one, so summing those moves per day and accumulating them over time
+gives the net staked series in O(events).
+
+State is persisted up to the last settled day: the events, each
+delegator's closing balance and the series so far. A refresh only fetches
+the days after that, applies them to the stored balances and extends the
+series. Unsettled days are recomputed on every refresh, as in
+``DailyAggregate``.
+"""
+import json
+import os
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from utils.daily_cache import SETTLE_DAYS, REFRESH_AFTER, _as_date, _lock_for
+from utils.settings import DATA_DIR, tmp_suffix
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+LEDGER_DIR = DATA_DIR / "staking_ledger"
+GENESIS = date(2022, 2, 10)  # first day of the net staked series
+DUST = 0.001                 # balances below this many AXL don't count as staked
+
+EVENTS_QUERY = """
+select block_timestamp::date as day, delegator_address as delegator,
+sum(case when action='undelegate' then -1*amount else amount end)/1e6 as change
+from axelar.gov.fact_staking
+where action in ('delegate', 'undelegate') and TX_SUCCEEDED=TRUE and block_timestamp::date>='{start}'
+group by 1, 2
+"""
+
+EVENT_COLUMNS = ["day", "delegator", "change"]
+SERIES_COLUMNS = ["day", "net_staked", "stakers"]
+
+
+def apply_changes(changes, opening):
+    """Apply daily balance ``changes`` on top of ``opening`` balances.
+
+    ``opening`` is a Series of balances indexed by delegator. Returns the
+    per-day moves of the net staked amount and of the staker count, and the
+    closing balances.
+    """
+    changes = changes.sort_values(["delegator", "day"], kind="stable").reset_index(drop=True)
+    start = changes["delegator"].map(opening).fillna(0.0)
+    balance = changes.groupby("delegator")["change"].cumsum() + start
+    previous = balance.groupby(changes["delegator"]).shift(1).fillna(start)
+
+    held = balance.where(balance >= DUST, 0.0)
+    previous_held = previous.where(previous >= DUST, 0.0)
+    moves = pd.DataFrame({
+        "day": changes["day"],
+        "net_staked": held - previous_held,
+        "stakers": (held > 0).astype(int) - (previous_held > 0).astype(int),
+    }).groupby("day")[["net_staked", "stakers"]].sum()
+
+    closing = balance.groupby(changes["delegator"]).last()
+    closing = pd.concat([opening[~opening.index.isin(closing.index)], closing])
+    return moves, closing
+
+
+def accumulate(moves, first, last, level=(0.0, 0)):
+    """Daily levels from ``first`` to ``last`` (inclusive), starting at ``level`` = (net_staked, stakers)."""
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    moves = moves.reindex(days, fill_value=0)
+    return pd.DataFrame({
+        "day": days,
+        "net_staked": moves["net_staked"].cumsum().to_numpy() + level[0],
+        "stakers": moves["stakers"].cumsum().to_numpy() + level[1],
+    })
+
+
+class StakingLedger:
+    """Net staked series kept up to date from new staking events only.
+
+    ``run`` executes the SQL and returns a DataFrame. Refreshes are
+    serialized per ledger directory across the process, so instances that
+    share a ``name`` never write its files at the same time. Keep one
+    instance per process (e.g. in ``st.cache_resource``) to also share the
+    in-memory series.
+    """
+
+    def __init__(self, run, name="staking", settle_days=SETTLE_DAYS, refresh_after=REFRESH_AFTER):
+        self.run = run
+        self.settle_days = settle_days
+        self.refresh_after = refresh_after
+        self._dir = LEDGER_DIR / name
+        self._series = None
+        self._refreshed_at = 0.0
+
+    # --- Storage ---
+    def _read(self):
+        try:
+            state = json.loads((self._dir / "state.json").read_text())
+            events = pd.read_parquet(self._dir / "events.parquet")
+            balances = pd.read_parquet(self._dir / "balances.parquet")
+            series = pd.read_parquet(self._dir / "series.parquet")
+        except (FileNotFoundError, ValueError):
+            empty = pd.DataFrame(columns=SERIES_COLUMNS)
+            return GENESIS - timedelta(days=1), pd.DataFrame(columns=EVENT_COLUMNS), pd.Series(dtype=float), empty
+        events["day"] = pd.to_datetime(events["day"]).dt.date
+        series["day"] = pd.to_datetime(series["day"]).dt.date
+        return date.fromisoformat(state["settled_through"]), events, balances.set_index("delegator")["balance"], series
+
+    def _write(self, settled_through, events, balances, series):
+        self._dir.mkdir(parents=True, exist_ok=True)
+        suffix = tmp_suffix()
+        files = {
+            "events.parquet": events,
+            "balances.parquet": balances.rename("balance").rename_axis("delegator").reset_index(),
+            "series.parquet": series,
+        }
+        for filename, df in files.items():
+            df.to_parquet((self._dir / filename).with_suffix(suffix), index=False)
+        (self._dir / "state.json").with_suffix(suffix).write_text(json.dumps({"settled_through": settled_through.isoformat()}))
+        # state.json goes last: it only ever points at fully written files
+        for filename in list(files) + ["state.json"]:
+            os.replace((self._dir / filename).with_suffix(suffix), self._dir / filename)
+
+    def _fetch(self, start):
+        df = self.run(EVENTS_QUERY.format(start=start.isoformat()))
+        df.columns = [c.lower() for c in df.columns]
+        df["day"] = pd.to_datetime(df["day"]).dt.date
+        df["change"] = df["change"].astype(float)
+        return df[EVENT_COLUMNS]
+
+    # --- Refresh ---
+    def refresh(self):
+        """Apply events newer than the last settled day and return the full daily series."""
+        today = date.today()
+        settle_cutoff = today - timedelta(days=1 + self.settle_days)
+        settled_through, events, balances, series = self._read()
+
+        new = self._fetch(settled_through + timedelta(days=1))
+        kept = events[events["day"] <= settled_through]
+        events = pd.concat([kept, new], ignore_index=True) if len(kept) else new
+
+        # Settle the days that can no longer change
+        if settle_cutoff > settled_through:
+            settling = new[new["day"] <= settle_cutoff]
+            moves, balances = apply_changes(settling, balances)
+            level = tuple(series[["net_staked", "stakers"]].iloc[-1]) if len(series) else (0.0, 0)
+            settled = accumulate(moves, settled_through + timedelta(days=1), settle_cutoff, level)
+            series = pd.concat([series, settled], ignore_index=True) if len(series) else settled
+            settled_through = settle_cutoff
+            self._write(settled_through, events, balances, series)
+
+        # Recent days are recomputed from the settled balances every time
+        if today > settled_through:
+            moves, _ = apply_changes(new[new["day"] > settled_through], balances)
+            level = tuple(series[["net_staked", "stakers"]].iloc[-1]) if len(series) else (0.0, 0)
+            recent = accumulate(moves, settled_through + timedelta(days=1), today, level)
+            series = pd.concat([series, recent], ignore_index=True) if len(series) else recent
+        return series
+
+    def series(self):
+        """Daily net staked amount and staker count, refreshed at most every ``refresh_after`` seconds."""
+        with _lock_for(str(self._dir)):
+            if self._series is None or time.time() - self._refreshed_at > self.refresh_after:
+                self._series = self.refresh()
+                self._refreshed_at = time.time()
+            return self._series
+
+    # --- Views ---
+    def net_staked(self, start_date=GENESIS, end_date=None):
+        """``Date`` / ``Net Staked`` rows between the dates, for days with at least one staker."""
+        start_date, end_date = _as_date(start_date), _as_date(end_date or date.today())
+        df = self.series()
+        df = df[(df["stakers"] > 0) & (df["day"] >= start_date) & (df["day"] <= end_date)]
+        return pd.DataFrame({"Date": pd.to_datetime(df["day"]), "Net Staked": df["net_staked"].round()}).reset_index(drop=True)
+
+    def current(self):
+        """The latest day's net staked amount."""
+        df = self.net_staked()
+        return float(df["Net Staked"].iloc[-1]) if len(df) else 0.0
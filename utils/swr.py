@@ -0,0 +1,134 @@
+"""Stale-while-revalidate caching for loaders.
+
+With ``@st.cache_data(ttl=...)`` an expired entry is recomputed in the
+foreground, so whoever visits first after expiry waits for the full
+refetch. ``@swr(ttl, max_stale)`` keeps serving the last value once it is
+older than ``ttl`` and refreshes it on the worker pool in the background.
+Only values older than ``max_stale`` (or missing) are computed while the
+caller waits. A failed background refresh keeps the old value and is
+retried on the next call.
+
+Entries are kept in process memory and shared by every session, at most
+``MAX_ENTRIES`` of them: storing a value drops entries past their
+``max_stale``, then the least recently used ones. Each call returns its own
+copy. ``loader.fetched_at(*args)`` gives the time the
+value for those arguments was fetched, and ``updated_caption`` turns it
+into a "last updated" line for the panel.
+"""
+import copy
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from utils.scheduler import background
+from utils.singleflight import Group
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+MAX_ENTRIES = 256    # cached values kept across all loaders and arguments
+
+_flights = Group()
+
+
+class _Entry:
+    def __init__(self, value, fetched_at, max_stale):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.max_stale = max_stale
+        self.refreshing = False
+
+
+@st.cache_resource
+def _entries():
+    """Process-wide ``{key: _Entry}`` in least recently used order, with the lock guarding it."""
+    return OrderedDict(), threading.Lock()
+
+
+def _evict(entries, now):
+    # Called with the lock held
+    for key in [key for key, entry in entries.items() if now - entry.fetched_at > entry.max_stale]:
+        del entries[key]
+    while len(entries) > MAX_ENTRIES:
+        entries.popitem(last=False)
+
+
+def _key(fn, args, kwargs):
+    # Page scripts are re-executed on every run, so a loader is identified by
+    # where it is defined rather than by the function object
+    name = f"{fn.__code__.co_filename}:{fn.__qualname__}"
+    return name, json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+def _compute(key, fn, args, kwargs, max_stale):
+    value = fn(*args, **kwargs)
+    entries, lock = _entries()
+    with lock:
+        now = time.time()
+        entries[key] = _Entry(value, now, max_stale)
+        entries.move_to_end(key)
+        _evict(entries, now)
+    return value
+
+
+def _refresh(key, fn, args, kwargs, max_stale):
+    try:
+        _flights.do(key, _compute, key, fn, args, kwargs, max_stale)
+    except Exception:
+        pass
+    finally:
+        entries, lock = _entries()
+        with lock:
+            if key in entries:
+                entries[key].refreshing = False
+
+
+def swr(ttl, max_stale):
+    """Cache a loader's value for ``ttl`` seconds and serve it stale for up to ``max_stale`` while it refreshes."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def loader(*args, **kwargs):
+            key = _key(fn, args, kwargs)
+            entries, lock = _entries()
+            with lock:
+                entry = entries.get(key)
+                if entry:
+                    entries.move_to_end(key)
+                age = time.time() - entry.fetched_at if entry else None
+                if entry and ttl < age <= max_stale and not entry.refreshing:
+                    entry.refreshing = True
+                    background(_refresh, key, fn, args, kwargs, max_stale)
+            if entry is None or age > max_stale:
+                value, _ = _flights.do(key, _compute, key, fn, args, kwargs, max_stale)
+            else:
+                value = entry.value
+            return copy.deepcopy(value)
+
+        def fetched_at(*args, **kwargs):
+            """Epoch seconds the cached value for these arguments was fetched, or ``None``."""
+            entries, lock = _entries()
+            with lock:
+                entry = entries.get(_key(fn, args, kwargs))
+            return entry.fetched_at if entry else None
+
+        loader.fetched_at = fetched_at
+        return loader
+
+    return decorate
+
+
+def updated_caption(fetched_at):
+    """``Last updated 5 min ago`` for an epoch timestamp (empty when unknown)."""
+    if fetched_at is None:
+        return ""
+    age = max(0, int(time.time() - fetched_at))
+    if age < 60:
+        ago = "just now"
+    elif age < 3600:
+        ago = f"{age // 60} min ago"
+    else:
+        ago = f"{age // 3600} h {age % 3600 // 60} min ago"
+    return f"Last updated {ago}"
@@ -0,0 +1,149 @@
+"""Full-history per-token chart series, stored locally and sliced per request.
+
+Asset Analysis used to request every token's chart for the exact selected
+window, so each date change re-downloaded every token. Here each
+(endpoint, asset) series is fetched once from ``HISTORY_START`` and kept as
+Parquet. A refresh only re-requests the tail from ``TAIL_OVERLAP`` before
+the last stored bucket, since recent buckets can still grow. Any date
+window is then a local slice.
+
+Freshness is the file's mtime, as in ``result_cache``.
+"""
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from utils.http_client import AXELARSCAN_API, get
+from utils.settings import DATA_DIR
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+SERIES_DIR = DATA_DIR / "token_series"
+HISTORY_START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+REFRESH_AFTER = 30 * 60              # seconds before the tail is re-requested
+TAIL_OVERLAP = pd.Timedelta(days=2)  # buckets before the last one that may still change
+COLUMNS = ["timestamp", "num_txs", "volume"]
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+# --- Parsing -----------------------------------------------------------------------------------------------------------
+def convert_timestamp_series(s):
+    """Parse epoch timestamps in s / ms / us / ns (guessed from magnitude) or date strings, as UTC."""
+    s_num = pd.to_numeric(s, errors="coerce")
+
+    if s_num.dropna().empty:
+        return pd.to_datetime(s, errors="coerce", utc=True)
+
+    maxv = s_num.max()
+
+    if maxv > 1e17:
+        unit = "ns"
+    elif maxv > 1e14:
+        unit = "us"
+    elif maxv > 1e11:
+        unit = "ms"
+    else:
+        unit = "s"
+
+    try:
+        return pd.to_datetime(s_num, unit=unit, errors="coerce", utc=True)
+    except Exception:
+        return pd.to_datetime(s, errors="coerce", utc=True)
+
+
+def sanitize_chart_df(df):
+    """``timestamp`` / ``num_txs`` / ``volume`` rows of a chart response, or an empty frame."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    for col in ["num_txs", "volume"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float)
+        else:
+            df[col] = 0.0
+
+    if "timestamp" not in df.columns:
+        return pd.DataFrame(columns=COLUMNS)
+
+    df["timestamp"] = convert_timestamp_series(df["timestamp"])
+    df = df.dropna(subset=["timestamp"])
+    return df[COLUMNS]
+
+
+def fetch_chart(endpoint, asset, from_time, to_time, timeout=60):
+    """One chart request; ``None`` when it fails."""
+    try:
+        resp = get(f"{AXELARSCAN_API}{endpoint}", params={"asset": asset, "fromTime": from_time, "toTime": to_time}, timeout=timeout)
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+    except Exception:
+        return None
+
+    if isinstance(data, dict) and "data" in data:
+        return sanitize_chart_df(pd.DataFrame(data["data"]))
+    if isinstance(data, list):
+        return sanitize_chart_df(pd.DataFrame(data))
+    return pd.DataFrame(columns=COLUMNS)
+
+
+# --- Store -------------------------------------------------------------------------------------------------------------
+def _path(endpoint, asset):
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{endpoint.strip('/')}__{asset}")
+    return SERIES_DIR / f"{name}.parquet"
+
+
+def _read(path):
+    try:
+        return pd.read_parquet(path), path.stat().st_mtime
+    except (FileNotFoundError, OSError, ValueError):
+        return None, 0.0
+
+
+def _write(path, df):
+    SERIES_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def history(endpoint, asset, refresh_after=REFRESH_AFTER):
+    """The token's full stored series, with the tail refreshed when it is older than ``refresh_after``."""
+    path = _path(endpoint, asset)
+    with _lock_for(path):
+        stored, written_at = _read(path)
+        if stored is not None and time.time() - written_at <= refresh_after:
+            return stored
+
+        if stored is not None and not stored.empty:
+            tail_start = max(stored["timestamp"].max() - TAIL_OVERLAP, pd.Timestamp(HISTORY_START))
+        else:
+            tail_start = pd.Timestamp(HISTORY_START)
+        tail = fetch_chart(endpoint, asset, int(tail_start.timestamp()), int(time.time()))
+        if tail is None:
+            # Keep serving what we have; the next call tries again
+            return stored if stored is not None else pd.DataFrame(columns=COLUMNS)
+
+        if stored is not None and not stored.empty:
+            stored = stored[stored["timestamp"] < tail_start]
+            tail = pd.concat([stored, tail], ignore_index=True) if not tail.empty else stored
+        tail = tail.drop_duplicates("timestamp", keep="last").sort_values("timestamp").reset_index(drop=True)
+        _write(path, tail)
+        return tail
+
+
+def window(df, from_time, to_time):
+    """Rows of a ``history`` frame between two epoch-second bounds (inclusive)."""
+    start = pd.Timestamp(from_time, unit="s", tz="UTC")
+    end = pd.Timestamp(to_time, unit="s", tz="UTC")
+    return df[(df["timestamp"] >= start) & (df["timestamp"] <= end)].reset_index(drop=True)
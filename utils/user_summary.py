@@ -0,0 +1,151 @@
+"""Per-user summary behind the user distribution charts.
+
+Every distribution on the User Analysis page buckets users (or their
+transactions) by something that can be computed once per user: volume,
+transaction count, distinct routes, and active days, weeks and months.
+``load_summary`` scans the store once for a date range and returns one row
+per user with all of these. The charts are then vectorized bucketing of
+that frame (``np.digitize`` and ``value_counts``), and their bucket edges
+can be changed without another scan.
+
+The transaction-size chart counts transfers, including those without a
+user, so it is counted in SQL instead: ``load_txn_sizes`` returns only the
+number of transfers per bucket of the given edges.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.fact_store import EXCLUDED_IDS_FILTER, query_local
+
+# --- Settings ----------------------------------------------------------------------------------------------------------
+TXN_SIZE_EDGES = [1, 10, 100, 1_000, 10_000, 100_000]
+USER_VOLUME_EDGES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+TXN_COUNT_EDGES = [1, 5, 10, 20, 50, 100, 200, 500, 1000]
+ROUTE_EDGES = [1, 3, 5, 10]
+ROUTE_LABELS = [
+    "Single Route Users (n=1)",
+    "Multi-Route Explorers (n=2,3)",
+    "Network Navigators (n=4,5)",
+    "Bridge Veterans (n=6-10)",
+    "Cross-Chain Masters (n>10)",
+]
+NO_VOLUME = "No Volume"
+
+SUMMARY_QUERY = """
+SELECT user, sum(amount_usd) as volume, count(distinct id) as txns,
+count(distinct case when source_chain is not null and destination_chain is not null
+    then source_chain || '➡' || destination_chain end) as routes,
+count(distinct created_at::date) as active_days,
+count(distinct date_trunc('week', created_at)) as active_weeks,
+count(distinct date_trunc('month', created_at)) as active_months
+FROM axelar_service
+where created_at::date>='{start}' and created_at::date<='{end}' and user is not null and
+{excluded}
+group by 1
+"""
+
+TXN_SIZE_QUERY = """
+SELECT {bucket} as bucket, count(distinct id) as transfers
+FROM axelar_service
+where created_at::date>='{start}' and created_at::date<='{end}' and
+{excluded}
+group by 1
+"""
+
+
+def load_summary(start_date, end_date):
+    """One row per user active between the dates (inclusive)."""
+    query = SUMMARY_QUERY.format(
+        start=start_date.strftime("%Y-%m-%d"),
+        end=end_date.strftime("%Y-%m-%d"),
+        excluded=EXCLUDED_IDS_FILTER,
+    )
+    return query_local(query)
+
+
+def _bucket_sql(column, edges):
+    """SQL for ``bucketize``'s bucket index of ``column``; -1 for NULL and NaN."""
+    whens = " ".join(f"when {column}<='{float(edge)!r}'::double then {i}" for i, edge in enumerate(edges))
+    return f"case when {column} is null or isnan({column}) then -1 {whens} else {len(edges)} end"
+
+
+def load_txn_sizes(start_date, end_date, edges=TXN_SIZE_EDGES):
+    """Transfers between the dates (inclusive) per transaction-size bucket of ``edges``."""
+    query = TXN_SIZE_QUERY.format(
+        bucket=_bucket_sql("amount_usd", edges),
+        start=start_date.strftime("%Y-%m-%d"),
+        end=end_date.strftime("%Y-%m-%d"),
+        excluded=EXCLUDED_IDS_FILTER,
+    )
+    return query_local(query)
+
+
+# --- Bucket labels -----------------------------------------------------------------------------------------------------
+def _compact(value):
+    for divisor, suffix in [(1_000_000, "m"), (1_000, "k")]:
+        if value >= divisor and value % divisor == 0:
+            return f"{value // divisor:g}{suffix}"
+    return f"{value:g}"
+
+
+def usd_labels(edges):
+    """``V<=1$``, ``1<V<=10$``, ... ``V>100k$`` for ``edges``."""
+    edges = [_compact(edge) for edge in edges]
+    return [f"V<={edges[0]}$"] + [f"{low}<V<={high}$" for low, high in zip(edges, edges[1:])] + [f"V>{edges[-1]}$"]
+
+
+def count_labels(edges, unit="Txn"):
+    """``1 Txn``, ``2-5 Txns``, ... ``>1000 Txns`` for integer ``edges``.
+
+    With any fractional edge the counts in a bucket are no longer a plain
+    integer range, so the labels are ``N<=1.5 Txns``, ``1.5<N<=5 Txns``, ...
+    """
+    if any(float(edge) != int(edge) for edge in edges):
+        edges = [f"{edge:g}" for edge in edges]
+        return ([f"N<={edges[0]} {unit}s"] + [f"{low}<N<={high} {unit}s" for low, high in zip(edges, edges[1:])]
+                + [f"N>{edges[-1]} {unit}s"])
+    edges = [int(edge) for edge in edges]
+    first = f"1 {unit}" if edges[0] == 1 else f"1-{edges[0]} {unit}s"
+    return [first] + [f"{low + 1}-{high} {unit}s" for low, high in zip(edges, edges[1:])] + [f">{edges[-1]} {unit}s"]
+
+
+# --- Distributions -----------------------------------------------------------------------------------------------------
+def bucketize(values, edges, labels, missing=None):
+    """Label each value with its ``(edges[i-1], edges[i]]`` bucket; NaN gets ``missing``."""
+    values = np.asarray(values, dtype=float)
+    classes = np.asarray(labels, dtype=object)[np.digitize(values, edges, right=True)]
+    classes[np.isnan(values)] = missing
+    return pd.Series(classes)
+
+
+def distribution(values, edges, labels, count_column, missing=None):
+    """``Class`` / ``count_column`` rows, largest first."""
+    classes = bucketize(values, edges, labels, missing).dropna()
+    counts = classes.value_counts()
+    return pd.DataFrame({"Class": counts.index, count_column: counts.to_numpy()})
+
+
+def txn_size_distribution(sizes, edges=TXN_SIZE_EDGES):
+    """``load_txn_sizes`` counts as ``Class`` / ``Number of Transfers`` rows, largest first."""
+    labels = np.asarray(usd_labels(edges) + [NO_VOLUME], dtype=object)    # bucket -1 is the last label
+    df = pd.DataFrame({"Class": labels[sizes["bucket"].to_numpy(dtype=int)], "Number of Transfers": sizes["transfers"].to_numpy()})
+    return df.sort_values("Number of Transfers", ascending=False, ignore_index=True)
+
+
+def user_volume_distribution(summary, edges=USER_VOLUME_EDGES):
+    return distribution(summary["volume"], edges, usd_labels(edges), "Number of Users", missing=NO_VOLUME)
+
+
+def txn_count_distribution(summary, edges=TXN_COUNT_EDGES):
+    return distribution(summary["txns"], edges, count_labels(edges), "Number of Users")
+
+
+def route_distribution(summary):
+    routes = summary.loc[summary["routes"] > 0, "routes"]
+    return distribution(routes, ROUTE_EDGES, ROUTE_LABELS, "Number of Users")
+
+
+def activity_distribution(summary, column, label):
+    """Users per number of active days / weeks / months, largest first."""
+    counts = summary[column].value_counts()
+    return pd.DataFrame({label: counts.index, "Number of Users": counts.to_numpy()})